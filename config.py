@@ -1,21 +1,109 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Optional
 import os
 
 from dotenv import load_dotenv
 
 
-# Load environment variables from a local .env file located in the project root
+# Local .env file located in the project root; parsed lazily, at most once per process
 PROJECT_ROOT = Path(__file__).resolve().parent
 ENV_PATH = PROJECT_ROOT / ".env"
-load_dotenv(dotenv_path=ENV_PATH)
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load the project .env into os.environ the first time it is needed."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    load_dotenv(dotenv_path=ENV_PATH)
+    _env_loaded = True
 
 
 # API keys and paths
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
-RUNWAY_API_KEY = os.getenv("RUNWAY_API_KEY")
+def openai_api_key() -> Optional[str]:
+    load_env()
+    return os.environ.get("OPENAI_API_KEY")
+
+
+def pexels_api_key() -> Optional[str]:
+    load_env()
+    return os.environ.get("PEXELS_API_KEY")
+
+
+def runway_api_key() -> Optional[str]:
+    load_env()
+    return os.environ.get("RUNWAY_API_KEY")
+
+
+def trend_script_model() -> str:
+    # Model for trend scripts; set TREND_SCRIPT_MODEL=gpt-4o to A/B against the larger model
+    load_env()
+    return os.environ.get("TREND_SCRIPT_MODEL", "gpt-4o-mini")
+
+
+def client_secret_file() -> str:
+    # Path to your Google OAuth client secrets JSON file
+    # Defaults to "client_secret.json" in the project if not provided
+    load_env()
+    return os.environ.get("CLIENT_SECRET_FILE", "client_secret.json")
+
+
+def youtube_token_file() -> str:
+    # Where the authorized YouTube OAuth token is cached between runs
+    load_env()
+    return os.environ.get("YOUTUBE_TOKEN_FILE", "token.json")
+
+
+@lru_cache(maxsize=1)
+def openai_client() -> Any:
+    """Return the process-wide OpenAI client.
+
+    The client owns a pooled HTTP session, so reusing it keeps connections alive across
+    calls instead of paying a new TCP/TLS handshake per request.
+    """
+    import httpx
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=openai_api_key(),
+        timeout=30,
+        max_retries=2,
+        http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=20)),
+    )
+
+
+@lru_cache(maxsize=1)
+def http_session() -> Any:
+    """Return the process-wide requests.Session for YouTube, Apify and Azure calls.
+
+    Pooled keep-alive connections skip the TCP/TLS handshake on repeat requests to the
+    same host. Idempotent requests that hit a connection error, 429 or 5xx are retried
+    with a short backoff.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504],
+                  raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry))
+    return session
+
+
+# Keep the old module constants (config.OPENAI_API_KEY, ...) working, resolved on access
+_LAZY_SETTINGS = {
+    "OPENAI_API_KEY": openai_api_key,
+    "PEXELS_API_KEY": pexels_api_key,
+    "RUNWAY_API_KEY": runway_api_key,
+    "CLIENT_SECRET_FILE": client_secret_file,
+}
 
-# Path to your Google OAuth client secrets JSON file
-# Defaults to "client_secret.json" in the project if not provided
-CLIENT_SECRET_FILE = os.getenv("CLIENT_SECRET_FILE", "client_secret.json")
 
+def __getattr__(name: str):
+    if name in _LAZY_SETTINGS:
+        return _LAZY_SETTINGS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
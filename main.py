@@ -1,12 +1,8 @@
-from openai import OpenAI
-from config import OPENAI_API_KEY
-from video_tools import generate_video_with_sora
-from youtube_upload import youtube_authenticate, upload_video
-
-client = OpenAI(api_key=OPENAI_API_KEY)
+from config import openai_client
 
 def generate_script(prompt):
-    resp = client.chat.completions.create(
+    # The shared client is created on first use, so importing this module stays cheap
+    resp = openai_client().chat.completions.create(
         model="gpt-4o",
         messages=[{
             "role": "user",
@@ -16,6 +12,13 @@ def generate_script(prompt):
     return resp.choices[0].message.content
 
 if __name__ == "__main__":
+    import logging
+
+    from youtube_upload import youtube_authenticate, upload_video
+
+    # Upload progress and the video link are reported through logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     topic = input("Enter topic for your YouTube Short: ")
 
     # 1. Generate script
@@ -24,6 +27,7 @@ if __name__ == "__main__":
     #out_path = "test_script.mp4"
 
     # 2. Get stock video
+    #from video_tools import generate_video_with_sora
     #video_path  = generate_video_with_sora(
     #        script,
     #        out_path=str(out_path),
@@ -1,104 +1,296 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Any
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import copy
 import re
 import json
 
 import openai
-import config  # loads .env and exposes OPENAI_API_KEY
+import config  # lazily loads .env; exposes openai_api_key() and the shared openai_client()
 
-openai.api_key = getattr(config, "OPENAI_API_KEY", None)
+try:
+    import ahocorasick  # optional: pyahocorasick for single-pass phrase matching
+except ImportError:
+    ahocorasick = None
 
+try:
+    from numba import njit  # optional: compiles the numeric scoring kernels below
+except ImportError:
+    njit = None
 
-POWER_HOOKS = {
+
+def _jit(func):
+    return njit(cache=True)(func) if njit is not None else func
+
+
+POWER_HOOKS = frozenset({
     "what if", "did you know", "here's why", "stop", "warning",
     "the secret", "nobody tells you", "don't make this mistake",
     "3 things", "top 5", "you won't believe", "the truth",
-}
+})
 
-CTA_PHRASES = {
+CTA_PHRASES = frozenset({
     "subscribe", "follow", "like this", "comment", "share",
     "click the link", "link in bio", "check the description",
     "try this", "save this", "watch till the end",
-}
+})
 
-TOXIC_KEYWORDS = {
+TOXIC_KEYWORDS = frozenset({
     # Placeholder list; replace with a real model or service for production
     "idiot", "stupid", "dumb", "hate", "kill", "trash", "loser",
     "shut up", "moron", "racist", "sexist", "terrorist",
-}
+})
 
-PROFANITY = {
+PROFANITY = frozenset({
     "fuck", "shit", "bitch", "asshole", "bastard", "dick", "cunt",
-}
+})
 
-POSITIVE_WORDS = {
+POSITIVE_WORDS = frozenset({
     "amazing", "great", "awesome", "love", "win", "success", "powerful",
     "easy", "simple", "best", "boost", "growth", "viral", "smart",
-}
+})
 
-NEGATIVE_WORDS = {
+NEGATIVE_WORDS = frozenset({
     "bad", "worst", "hate", "fail", "hard", "problem", "risk",
     "danger", "scam", "loss", "decline",
+})
+
+TONE_PHRASES = {
+    "persuasive": ("you", "now", "today", "must", "need to", "cta"),
+    "informative": ("how to", "steps", "tip", "learn", "guide", "why"),
+    "entertaining": ("funny", "joke", "crazy", "wild", "insane", "wow"),
+    "story": ("story", "once", "i was", "we were", "learned"),
 }
 
+_TOXIC_OR_PROFANE = TOXIC_KEYWORDS | PROFANITY
+
+# Precompiled patterns used by the tokenizers and sanitizers below
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[a-zA-Z0-9']+")
+_SENT_SPLIT_RE = re.compile(r"[.!?]+")
+_ALLCAPS_RE = re.compile(r"\b[A-Z]{2,}\b")
+_TAG_CLEAN_RE = re.compile(r"[^A-Za-z0-9_]+")
+
+# ASCII fast path for _lower_words: every non-token character becomes a space
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'")
+_ASCII_TOKEN_TABLE = str.maketrans({chr(c): " " for c in range(128) if chr(c) not in _WORD_CHARS})
+# ASCII fast path for _ALLCAPS_RE: split into regex word-character runs ([A-Za-z0-9_]),
+# which are exactly the spans a \b...\b match can cover
+_ASCII_REGEX_WORD_TABLE = str.maketrans(
+    {chr(c): " " for c in range(128) if not (chr(c).isalnum() or chr(c) == "_")}
+)
+
+# ASCII fast path for hashtag cleanup: delete everything except [A-Za-z0-9_]
+_TAG_DELETE_TABLE = str.maketrans(
+    "", "", "".join(chr(c) for c in range(128) if not (chr(c).isalnum() or chr(c) == "_"))
+)
+
+# JSON mode guarantees parseable output; a fixed seed keeps repeated requests reproducible
+LLM_RESPONSE_FORMAT = {"type": "json_object"}
+LLM_SEED = 1234
+
+# Scripts shorter than this (in tokens) are not worth an LLM call
+LLM_MIN_TOKENS = 5
+
 
 def _normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", text or "").strip()
+    return _WS_RE.sub(" ", text or "").strip()
+
+
+# Tokenizers are pure functions of the input text, so repeated scoring of the
+# same script (or of the same first sentence) reuses the cached token tuples.
+@lru_cache(maxsize=256)
+def _lower_words(text: str) -> Tuple[str, ...]:
+    return _words_from_lower((text or "").lower())
+
+
+def _words_from_lower(lower_text: str) -> Tuple[str, ...]:
+    # Tokenize text that is already lowercased, skipping another full-string copy
+    if lower_text.isascii():
+        return tuple(lower_text.translate(_ASCII_TOKEN_TABLE).split())
+    return tuple(_WORD_RE.findall(lower_text))
+
+
+@lru_cache(maxsize=256)
+def _tokenize_with_caps(text: str) -> Tuple[Tuple[str, ...], int]:
+    """Lowercased tokens plus the number of ALL-CAPS words (2+ letters A-Z)."""
+    text = text or ""
+    if not text.isascii():
+        return _lower_words(text), len(_ALLCAPS_RE.findall(text))
+    words = tuple(text.translate(_ASCII_TOKEN_TABLE).lower().split())
+    n_caps = sum(
+        1 for run in text.translate(_ASCII_REGEX_WORD_TABLE).split()
+        if len(run) >= 2 and run.isalpha() and run.isupper()
+    )
+    return words, n_caps
+
+
+@lru_cache(maxsize=256)
+def _sentences(text: str) -> Tuple[str, ...]:
+    return tuple(s.strip() for s in _SENT_SPLIT_RE.split(text or "") if s.strip())
 
 
-def _lower_words(text: str) -> List[str]:
-    return re.findall(r"[a-zA-Z0-9']+", (text or "").lower())
+# Numeric scoring kernels: pure arithmetic on token statistics, compiled when numba is present
 
+@_jit
+def _sentiment_core(pos: int, neg: int) -> float:
+    return (pos - neg) / max(1, pos + neg)  # -1..1
 
-def _sentences(text: str) -> List[str]:
-    return [s.strip() for s in re.split(r"[.!?]+", text or "") if s.strip()]
 
+@_jit
+def _hook_core(length_words: int, power_hits: int) -> float:
+    # Favor short, punchy hooks with power phrases
+    length_score = 1.0 if 4 <= length_words <= 16 else 0.5 if length_words <= 24 else 0.2
+    return max(0.0, min(1.0, 0.6 * length_score + 0.4 * (1.0 if power_hits else 0.0)))
+
+
+@_jit
+def _readability_core(num_words: int, num_sentences: int, total_chars: int) -> Tuple[float, float, float]:
+    avg_words_per_sentence = num_words / num_sentences
+    avg_chars_per_word = total_chars / num_words
+    # Crude readability proxy: shorter sentences/words => easier
+    ease = max(0.0, min(1.0, 1.2 - (avg_words_per_sentence / 25.0) - (avg_chars_per_word / 8.0)))
+    return ease, avg_words_per_sentence, avg_chars_per_word
+
+
+@_jit
+def _virality_core(hook: float, sent: float, cta: float, read: float, vocab: float, tox: float) -> float:
+    # Heuristic blend; placeholder until a trained model is available
+    base = (
+        0.25 * hook +
+        0.2 * (0.5 + 0.5 * sent) +  # map -1..1 -> 0..1
+        0.15 * cta +
+        0.2 * read +
+        0.15 * vocab +
+        0.05 * (1.0 - tox)
+    )
+    return max(0.0, min(1.0, base))
 
-def analyze_toxicity(script: str) -> Dict[str, Any]:
-    words = _lower_words(script)
-    toxic_hits = [w for w in words if w in TOXIC_KEYWORDS or w in PROFANITY]
+
+def _ordered_hits(words: Sequence[str], counts: Counter, lexicon: frozenset) -> List[str]:
+    """Return every token of `words` found in `lexicon`, in script order.
+
+    The disjointness check runs over the script's vocabulary, so the full token list is
+    only scanned when there is at least one hit.
+    """
+    if lexicon.isdisjoint(counts):
+        return []
+    return [w for w in words if w in lexicon]
+
+
+def analyze_toxicity(
+    script: str,
+    words: Optional[Sequence[str]] = None,
+    counts: Optional[Counter] = None,
+) -> Dict[str, Any]:
+    if words is None:
+        words = _lower_words(script)
+    if counts is None:
+        counts = Counter(words)
+    toxic_hits = _ordered_hits(words, counts, _TOXIC_OR_PROFANE)
     score = min(1.0, len(toxic_hits) / 3.0)  # crude placeholder
     return {"score": round(score, 3), "hits": toxic_hits}
 
 
-def analyze_sentiment(script: str) -> Dict[str, Any]:
-    words = _lower_words(script)
-    pos = sum(1 for w in words if w in POSITIVE_WORDS)
-    neg = sum(1 for w in words if w in NEGATIVE_WORDS)
-    total = max(1, pos + neg)
-    sentiment = (pos - neg) / total  # -1..1
+def analyze_sentiment(
+    script: str,
+    words: Optional[Sequence[str]] = None,
+    counts: Optional[Counter] = None,
+) -> Dict[str, Any]:
+    if counts is None:
+        counts = Counter(_lower_words(script) if words is None else words)
+    pos = sum(counts[w] for w in POSITIVE_WORDS if w in counts)
+    neg = sum(counts[w] for w in NEGATIVE_WORDS if w in counts)
+    sentiment = _sentiment_core(pos, neg)
     label = "positive" if sentiment > 0.15 else ("negative" if sentiment < -0.15 else "neutral")
     return {"score": round(sentiment, 3), "label": label, "pos": pos, "neg": neg}
 
 
-def detect_cta(script: str) -> Dict[str, Any]:
-    text = script.lower()
-    hits = [p for p in CTA_PHRASES if p in text]
+def _build_phrase_index() -> Dict[str, Tuple[str, ...]]:
+    """Map every hook/CTA/tone phrase to the categories it belongs to."""
+    categories: Dict[str, List[str]] = {}
+    for phrase in POWER_HOOKS:
+        categories.setdefault(phrase, []).append("hook")
+    for phrase in CTA_PHRASES:
+        categories.setdefault(phrase, []).append("cta")
+    for tone, phrases in TONE_PHRASES.items():
+        for phrase in phrases:
+            categories.setdefault(phrase, []).append(tone)
+    return {phrase: tuple(cats) for phrase, cats in categories.items()}
+
+
+_PHRASE_INDEX = _build_phrase_index()
+
+
+def _build_phrase_automaton() -> Optional[Any]:
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for phrase, categories in _PHRASE_INDEX.items():
+        automaton.add_word(phrase, (phrase, categories))
+    automaton.make_automaton()
+    return automaton
+
+
+_PHRASE_AUTOMATON = _build_phrase_automaton()
+
+
+def _phrase_hits(lower_text: str) -> Dict[str, set]:
+    """Return {category: phrases found as substrings of lower_text} in one scan."""
+    hits: Dict[str, set] = {}
+    if _PHRASE_AUTOMATON is not None:
+        for _, (phrase, categories) in _PHRASE_AUTOMATON.iter(lower_text):
+            for category in categories:
+                hits.setdefault(category, set()).add(phrase)
+    else:
+        for phrase, categories in _PHRASE_INDEX.items():
+            if phrase in lower_text:
+                for category in categories:
+                    hits.setdefault(category, set()).add(phrase)
+    return hits
+
+
+def detect_cta(
+    script: str,
+    phrase_hits: Optional[Dict[str, set]] = None,
+    lower_text: Optional[str] = None,
+) -> Dict[str, Any]:
+    if phrase_hits is None:
+        phrase_hits = _phrase_hits(lower_text if lower_text is not None else script.lower())
+    found = phrase_hits.get("cta", ())
+    hits = [p for p in CTA_PHRASES if p in found]
     return {"present": bool(hits), "phrases": hits}
 
 
-def measure_hook_strength(script: str) -> Dict[str, Any]:
-    first_sentence = _sentences(script)[:1]
+def measure_hook_strength(script: str, sentences: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    if sentences is None:
+        sentences = _sentences(script)
+    first_sentence = sentences[:1]
     first = first_sentence[0].lower() if first_sentence else ""
-    power_hits = sum(1 for ph in POWER_HOOKS if ph in first)
-    length_words = len(_lower_words(first))
-    # Favor short, punchy hooks with power phrases
-    length_score = 1.0 if 4 <= length_words <= 16 else 0.5 if length_words <= 24 else 0.2
-    score = max(0.0, min(1.0, 0.6 * length_score + 0.4 * (1.0 if power_hits else 0.0)))
+    power_hits = len(_phrase_hits(first).get("hook", ()))
+    length_words = len(_words_from_lower(first))
+    score = _hook_core(length_words, power_hits)
     return {"score": round(score, 3), "first_sentence": first, "power_hits": power_hits}
 
 
-def readability(script: str) -> Dict[str, Any]:
-    words = _lower_words(script)
-    sentences = _sentences(script)
+def readability(
+    script: str,
+    words: Optional[Sequence[str]] = None,
+    sentences: Optional[Sequence[str]] = None,
+    total_chars: Optional[int] = None,
+) -> Dict[str, Any]:
+    if words is None:
+        words = _lower_words(script)
+    if sentences is None:
+        sentences = _sentences(script)
+    if total_chars is None:
+        total_chars = sum(len(w) for w in words)
     num_words = max(1, len(words))
     num_sentences = max(1, len(sentences))
-    avg_words_per_sentence = num_words / num_sentences
-    avg_chars_per_word = sum(len(w) for w in words) / num_words
-    # Crude readability proxy: shorter sentences/words => easier
-    ease = max(0.0, min(1.0, 1.2 - (avg_words_per_sentence / 25.0) - (avg_chars_per_word / 8.0)))
+    ease, avg_words_per_sentence, avg_chars_per_word = _readability_core(num_words, num_sentences, total_chars)
     level = "easy" if ease > 0.66 else ("medium" if ease > 0.33 else "hard")
     return {
         "ease": round(ease, 3),
@@ -108,19 +300,47 @@ def readability(script: str) -> Dict[str, Any]:
     }
 
 
-def brand_safety(script: str, banned: Optional[List[str]] = None) -> Dict[str, Any]:
-    banned = set((banned or []) + list(PROFANITY))
-    text = script.lower()
-    hits = sorted({w for w in banned if w in text})
+def brand_safety(
+    script: str,
+    banned: Optional[List[str]] = None,
+    lower_text: Optional[str] = None,
+    words: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    banned = PROFANITY if not banned else PROFANITY | frozenset(w.lower() for w in banned)
+    text = lower_text if lower_text is not None else script.lower()
+    if words is None:
+        words = _words_from_lower(text)
+    banned_words, banned_phrases = _split_banned(banned)
+    # Whole-word entries via one set intersection; only multi-token entries need a text scan
+    found = set(banned_words.intersection(words))
+    found.update(p for p in banned_phrases if p in text)
+    hits = sorted(found)
     safe = len(hits) == 0
     return {"safe": safe, "hits": hits}
 
 
-def platform_guidelines(script: str, platform: str = "youtube_shorts") -> Dict[str, Any]:
-    words = _lower_words(script)
+@lru_cache(maxsize=64)
+def _split_banned(banned: frozenset) -> Tuple[frozenset, Tuple[str, ...]]:
+    single = frozenset(w for w in banned if _words_from_lower(w) == (w,))
+    return single, tuple(w for w in banned if w not in single and w.strip())
+
+
+def platform_guidelines(
+    script: str,
+    platform: str = "youtube_shorts",
+    words: Optional[Sequence[str]] = None,
+    counts: Optional[Counter] = None,
+    all_caps: Optional[int] = None,
+) -> Dict[str, Any]:
+    if words is None or all_caps is None:
+        tokenized, n_caps = _tokenize_with_caps(script)
+        words = tokenized if words is None else words
+        all_caps = n_caps if all_caps is None else all_caps
+    if counts is None:
+        counts = Counter(words)
     tokens = len(words)
-    all_caps_ratio = sum(1 for w in re.findall(r"\b[A-Z]{2,}\b", script)) / max(1, len(words))
-    profanity_hits = [w for w in words if w in PROFANITY]
+    all_caps_ratio = all_caps / max(1, len(words))
+    profanity_hits = _ordered_hits(words, counts, PROFANITY)
 
     # For approximately 12s scripts: ~25-45 words depending on pace
     if platform == "youtube_shorts":
@@ -145,42 +365,63 @@ def platform_guidelines(script: str, platform: str = "youtube_shorts") -> Dict[s
     }
 
 
-def vocabulary_diversity(script: str) -> Dict[str, Any]:
-    words = [w for w in _lower_words(script) if w.isalpha()]
-    unique = len(set(words))
-    total = max(1, len(words))
+def vocabulary_diversity(
+    script: str,
+    words: Optional[Sequence[str]] = None,
+    alpha_counts: Optional[Dict[str, int]] = None,
+    counts: Optional[Counter] = None,
+) -> Dict[str, Any]:
+    if alpha_counts is not None:
+        unique = len(alpha_counts)
+        total = sum(alpha_counts.values())
+    else:
+        if counts is None:
+            counts = Counter(words if words is not None else _lower_words(script))
+        # Walk the distinct words only; no filtered token list or set is built
+        unique = total = 0
+        for word, n in counts.items():
+            if word.isalpha():
+                unique += 1
+                total += n
+    total = max(1, total)
     diversity = unique / total
     return {"diversity": round(diversity, 3), "unique": unique, "total": total}
 
 
-def tone_classification(script: str) -> Dict[str, Any]:
-    text = (script or "").lower()
-    labels = [
-        ("persuasive", any(p in text for p in ("you", "now", "today", "must", "need to", "cta"))),
-        ("informative", any(p in text for p in ("how to", "steps", "tip", "learn", "guide", "why"))),
-        ("entertaining", any(p in text for p in ("funny", "joke", "crazy", "wild", "insane", "wow"))),
-        ("story", any(p in text for p in ("story", "once", "i was", "we were", "learned"))),
-    ]
-    active = [l for l, flag in labels if flag]
+def tone_classification(
+    script: str,
+    phrase_hits: Optional[Dict[str, set]] = None,
+    lower_text: Optional[str] = None,
+) -> Dict[str, Any]:
+    if phrase_hits is None:
+        phrase_hits = _phrase_hits(lower_text if lower_text is not None else (script or "").lower())
+    active = [tone for tone in TONE_PHRASES if phrase_hits.get(tone)]
     label = active[0] if active else "neutral"
     return {"label": label, "candidates": active}
 
 
 def _sanitize_hashtags(tags: List[str], max_tags: int = 6) -> List[str]:
+    return list(_sanitize_tag_tuple(tuple(t for t in tags if isinstance(t, str)), max_tags))
+
+
+@lru_cache(maxsize=512)
+def _sanitize_tag_tuple(tags: Tuple[str, ...], max_tags: int) -> Tuple[str, ...]:
     cleaned: List[str] = []
     seen = set()
     for tag in tags:
-        if not isinstance(tag, str):
-            continue
         t = tag.strip()
         if not t:
             continue
-        if not t.startswith("#"):
-            t = "#" + t
-        # normalize: remove internal spaces
-        t = re.sub(r"\s+", "", t)
-        # simple guard: keep hashtags alnum and '#', allow underscores
-        t = "#" + re.sub(r"[^A-Za-z0-9_]+", "", t.lstrip("#"))
+        if t.isascii():
+            # Deleting every non [A-Za-z0-9_] char also drops spaces and leading '#'
+            t = "#" + t.translate(_TAG_DELETE_TABLE)
+        else:
+            if not t.startswith("#"):
+                t = "#" + t
+            # normalize: remove internal spaces
+            t = _WS_RE.sub("", t)
+            # simple guard: keep hashtags alnum and '#', allow underscores
+            t = "#" + _TAG_CLEAN_RE.sub("", t.lstrip("#"))
         if len(t) <= 1:
             continue
         if t.lower() in seen:
@@ -189,13 +430,16 @@ def _sanitize_hashtags(tags: List[str], max_tags: int = 6) -> List[str]:
         cleaned.append(t)
         if len(cleaned) >= max_tags:
             break
-    return cleaned
+    return tuple(cleaned)
 
 
-def _heuristic_hashtag_suggestions(topic: Optional[str], sentiment_label: str) -> List[str]:
+@lru_cache(maxsize=256)
+def _heuristic_hashtag_suggestions(
+    topic: Optional[str], sentiment_label: str, max_tags: int = 6
+) -> Tuple[str, ...]:
     base = ["#Shorts", "#viral", "#fyp"]
     if topic:
-        cleaned = re.sub(r"\s+", "", topic)
+        cleaned = _WS_RE.sub("", topic)
         if cleaned:
             base.append(f"#{cleaned}")
     if sentiment_label == "positive":
@@ -204,7 +448,7 @@ def _heuristic_hashtag_suggestions(topic: Optional[str], sentiment_label: str) -
         base += ["#lessons", "#truth"]
     else:
         base += ["#learn", "#tips"]
-    return _sanitize_hashtags(base, max_tags=6)
+    return _sanitize_tag_tuple(tuple(base), max_tags)
 
 
 def llm_hashtag_suggestions(
@@ -214,14 +458,14 @@ def llm_hashtag_suggestions(
     trending_hashtags: Optional[List[str]] = None,
     max_tags: int = 6,
 ) -> List[str]:
-    if not openai.api_key:
-        return _heuristic_hashtag_suggestions(topic, sentiment_label)
+    if not config.openai_api_key():
+        return list(_heuristic_hashtag_suggestions(topic, sentiment_label))
 
     sys_instructions = (
         "You are a social media growth strategist. Generate concise, highly-viral hashtags for a short-form video. "
         "Use only relevant, platform-safe hashtags. Prefer specificity over generic tags, but include 1-2 broad viral tags. "
         "If trending hashtags are provided and they fit the content, prioritize including 1-3 of them. "
-        "Return ONLY a JSON array of strings (hashtags), 4 to 6 items, no explanations."
+        "Return ONLY a JSON object of the form {\"hashtags\": [\"#tag\", ...]} with 4 to 6 items, no explanations."
     )
 
     trending_text = ", ".join(trending_hashtags or [])
@@ -234,7 +478,7 @@ def llm_hashtag_suggestions(
         "constraints": {
             "optimize_for": "virality",
             "count": {"min": 4, "max": max_tags},
-            "format": "return JSON array only",
+            "format": "return a JSON object with a 'hashtags' array only",
             "rules": [
                 "no spaces inside a hashtag",
                 "no emojis",
@@ -246,27 +490,45 @@ def llm_hashtag_suggestions(
     }
 
     try:
-        resp = openai.ChatCompletion.create(
+        resp = config.openai_client().chat.completions.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": sys_instructions},
                 {"role": "user", "content": json.dumps(user_prompt)},
             ],
             temperature=0.5,
+            response_format=LLM_RESPONSE_FORMAT,
+            seed=LLM_SEED,
         )
-        content = resp.choices[0].message["content"].strip()
-        # Try parse as JSON first
-        tags: List[str] = []
-        try:
-            tags = json.loads(content)
-        except Exception:
-            # Fallback: split lines/commas
-            parts = re.split(r"[\n,]", content)
-            tags = [p.strip() for p in parts if p.strip()]
+        content = resp.choices[0].message.content
+        tags = json.loads(content).get("hashtags", [])
         return _sanitize_hashtags(tags, max_tags=max_tags)
     except Exception:
         # Fallback to heuristic if LLM call fails
-        return _heuristic_hashtag_suggestions(topic, sentiment_label)
+        return list(_heuristic_hashtag_suggestions(topic, sentiment_label))
+
+
+_VERIFIER_SYS_INSTRUCTIONS = (
+    "You are a social media content analyst. Evaluate the provided short-form video script. "
+    "Output STRICT JSON only, matching the provided schema. Do not include any extra text. "
+    "Score ranges: use 0-1 floats for scores unless otherwise specified."
+)
+
+_VERIFIER_SCHEMA = {
+    "toxicity": {"score": "float 0..1", "label": "safe|risky"},
+    "sentiment": {"label": "positive|neutral|negative", "score": "float -1..1"},
+    "cta": {"present": "bool", "phrases": ["string"]},
+    "hook": {"score": "float 0..1", "rationale": "string"},
+    "readability": {"level": "easy|medium|hard", "score": "float 0..1"},
+    "brand_safety": {"safe": "bool", "issues": ["string"]},
+    "tone": {"label": "persuasive|informative|entertaining|story|neutral"},
+    "virality": {"score": "int 0..100", "rationale": "string"},
+    "platform_guidelines": {"compliant": "bool", "issues": ["string"]},
+    "hashtags": ["string"],
+}
+
+# Scripts per batched request; keeps the JSON reply within the output-token budget
+LLM_BATCH_SIZE = 10
 
 
 def llm_analyze_verifiers(
@@ -277,29 +539,36 @@ def llm_analyze_verifiers(
     max_tags: int = 6,
 ) -> Optional[Dict[str, Any]]:
     """Use an LLM to score/classify the verifiers in one pass. Returns None on failure."""
-    if not openai.api_key:
+    if not config.openai_api_key():
         return None
 
-    sys_instructions = (
-        "You are a social media content analyst. Evaluate the provided short-form video script. "
-        "Output STRICT JSON only, matching the provided schema. Do not include any extra text. "
-        "Score ranges: use 0-1 floats for scores unless otherwise specified."
-    )
+    payload = _verifier_payload(script, topic, platform, trending_hashtags, max_tags)
 
-    schema = {
-        "toxicity": {"score": "float 0..1", "label": "safe|risky"},
-        "sentiment": {"label": "positive|neutral|negative", "score": "float -1..1"},
-        "cta": {"present": "bool", "phrases": ["string"]},
-        "hook": {"score": "float 0..1", "rationale": "string"},
-        "readability": {"level": "easy|medium|hard", "score": "float 0..1"},
-        "brand_safety": {"safe": "bool", "issues": ["string"]},
-        "tone": {"label": "persuasive|informative|entertaining|story|neutral"},
-        "virality": {"score": "int 0..100", "rationale": "string"},
-        "platform_guidelines": {"compliant": "bool", "issues": ["string"]},
-        "hashtags": ["string"],
-    }
+    try:
+        resp = config.openai_client().chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": _VERIFIER_SYS_INSTRUCTIONS},
+                {"role": "user", "content": json.dumps(payload)},
+            ],
+            temperature=0.3,
+            response_format=LLM_RESPONSE_FORMAT,
+            seed=LLM_SEED,
+        )
+        content = resp.choices[0].message.content
+        return _parse_verifier_report(content, max_tags)
+    except Exception:
+        return None
 
-    payload = {
+
+def _verifier_payload(
+    script: str,
+    topic: Optional[str],
+    platform: str,
+    trending_hashtags: Optional[List[str]],
+    max_tags: int,
+) -> Dict[str, Any]:
+    return {
         "topic": topic or "",
         "platform": platform,
         "trending_hashtags_placeholder": ", ".join(trending_hashtags or []),
@@ -309,46 +578,186 @@ def llm_analyze_verifiers(
             "hashtags_max": max_tags,
             "use_trending_if_relevant": True,
             "return_strict_json": True,
-            "schema": schema,
+            "schema": _VERIFIER_SCHEMA,
+        },
+    }
+
+
+def _parse_verifier_report(content: str, max_tags: int) -> Dict[str, Any]:
+    data = json.loads(content)
+    # Sanitize hashtags and clamp ranges
+    data["hashtags"] = _sanitize_hashtags(data.get("hashtags", []), max_tags=max_tags)
+    return data
+
+
+class _RequestRateLimiter:
+    """Spaces request starts so no more than `per_minute` begin in any minute."""
+
+    def __init__(self, per_minute: int):
+        self._interval = 60.0 / max(1, per_minute)
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _llm_analyze_verifiers_async(
+    client: Any,
+    semaphore: asyncio.Semaphore,
+    limiter: _RequestRateLimiter,
+    script: str,
+    topic: Optional[str],
+    platform: str,
+    trending_hashtags: Optional[List[str]],
+    max_tags: int,
+) -> Optional[Dict[str, Any]]:
+    payload = _verifier_payload(script, topic, platform, trending_hashtags, max_tags)
+    async with semaphore:
+        await limiter.wait()
+        try:
+            resp = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": _VERIFIER_SYS_INSTRUCTIONS},
+                    {"role": "user", "content": json.dumps(payload)},
+                ],
+                temperature=0.3,
+                response_format=LLM_RESPONSE_FORMAT,
+                seed=LLM_SEED,
+            )
+            content = resp.choices[0].message.content
+            return _parse_verifier_report(content, max_tags)
+        except Exception:
+            return None
+
+
+def llm_analyze_verifiers_batch(
+    scripts: List[str],
+    topics: Optional[List[Optional[str]]] = None,
+    platform: str = "youtube_shorts",
+    trending_hashtags: Optional[List[str]] = None,
+    max_tags: int = 6,
+    batch_size: int = LLM_BATCH_SIZE,
+) -> List[Optional[Dict[str, Any]]]:
+    """Score many scripts with one LLM call per `batch_size` scripts.
+
+    Returns one report per input script, in input order; an entry is None when the
+    model's output for that script could not be used.
+    """
+    if not config.openai_api_key():
+        return [None] * len(scripts)
+
+    topics = list(topics) if topics is not None else [None] * len(scripts)
+    reports: List[Optional[Dict[str, Any]]] = []
+    for start in range(0, len(scripts), max(1, batch_size)):
+        end = start + max(1, batch_size)
+        reports.extend(
+            _llm_analyze_chunk(
+                scripts[start:end],
+                topics[start:end],
+                platform=platform,
+                trending_hashtags=trending_hashtags,
+                max_tags=max_tags,
+            )
+        )
+    return reports
+
+
+def _llm_analyze_chunk(
+    scripts: List[str],
+    topics: List[Optional[str]],
+    platform: str,
+    trending_hashtags: Optional[List[str]],
+    max_tags: int,
+) -> List[Optional[Dict[str, Any]]]:
+    count = len(scripts)
+    sys_instructions = (
+        _VERIFIER_SYS_INSTRUCTIONS
+        + f" You will receive {count} scripts. Return a JSON object {{\"items\": [...]}} whose array holds "
+        f"{count} objects matching the schema, one per input item, in input order, each including "
+        "the item's integer \"id\"."
+    )
+
+    payload = {
+        "platform": platform,
+        "trending_hashtags_placeholder": ", ".join(trending_hashtags or []),
+        "items": [
+            {"id": i, "topic": topic or "", "script": script[:2000]}
+            for i, (script, topic) in enumerate(zip(scripts, topics))
+        ],
+        "instructions": {
+            "optimize_hashtags_for": "virality",
+            "hashtags_max": max_tags,
+            "use_trending_if_relevant": True,
+            "return_strict_json": True,
+            "return_json_array_length": count,
+            "schema": _VERIFIER_SCHEMA,
         },
     }
 
+    reports: List[Optional[Dict[str, Any]]] = [None] * count
     try:
-        resp = openai.ChatCompletion.create(
+        resp = config.openai_client().chat.completions.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": sys_instructions},
                 {"role": "user", "content": json.dumps(payload)},
             ],
             temperature=0.3,
+            response_format=LLM_RESPONSE_FORMAT,
+            seed=LLM_SEED,
         )
-        content = resp.choices[0].message["content"].strip()
-        data = json.loads(content)
-        # Sanitize hashtags and clamp ranges
-        data["hashtags"] = _sanitize_hashtags(data.get("hashtags", []), max_tags=max_tags)
-        return data
+        content = resp.choices[0].message.content
+        data = json.loads(content).get("items")
     except Exception:
-        return None
+        return reports
 
+    if not isinstance(data, list):
+        return reports
 
-def virality_score(script: str, topic: Optional[str] = None) -> Dict[str, Any]:
-    tox = analyze_toxicity(script)["score"]
-    sent = analyze_sentiment(script)["score"]
-    hook = measure_hook_strength(script)["score"]
-    cta = 1.0 if detect_cta(script)["present"] else 0.0
-    read = readability(script)["ease"]
-    vocab = vocabulary_diversity(script)["diversity"]
+    # Align by the echoed id when present, otherwise by position; the first item wins when
+    # the model repeats an id, and bools (an int subclass) are not ids
+    for position, item in enumerate(data):
+        if not isinstance(item, dict):
+            continue
+        index = item.get("id", position)
+        if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < count:
+            continue
+        if reports[index] is not None:
+            continue
+        item["hashtags"] = _sanitize_hashtags(item.get("hashtags", []), max_tags=max_tags)
+        reports[index] = item
+    return reports
 
-    # Heuristic blend; placeholder until a trained model is available
-    base = (
-        0.25 * hook +
-        0.2 * (0.5 + 0.5 * sent) +  # map -1..1 -> 0..1
-        0.15 * cta +
-        0.2 * read +
-        0.15 * vocab +
-        0.05 * (1.0 - tox)
-    )
-    score_0_100 = int(round(max(0.0, min(1.0, base)) * 100))
+
+def virality_score(
+    script: str,
+    topic: Optional[str] = None,
+    tox: Optional[Dict[str, Any]] = None,
+    sent: Optional[Dict[str, Any]] = None,
+    hook: Optional[Dict[str, Any]] = None,
+    cta: Optional[Dict[str, Any]] = None,
+    read: Optional[Dict[str, Any]] = None,
+    vocab: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Blend verifier sub-scores into a 0-100 virality estimate.
+
+    Precomputed verifier reports can be passed in to avoid re-analyzing the script.
+    """
+    tox = (tox or analyze_toxicity(script))["score"]
+    sent = (sent or analyze_sentiment(script))["score"]
+    hook = (hook or measure_hook_strength(script))["score"]
+    cta = 1.0 if (cta or detect_cta(script))["present"] else 0.0
+    read = (read or readability(script))["ease"]
+    vocab = (vocab or vocabulary_diversity(script))["diversity"]
+
+    score_0_100 = int(round(_virality_core(hook, sent, cta, read, vocab, tox) * 100))
     return {"score": score_0_100}
 
 
@@ -360,6 +769,12 @@ def analyze_script(
     use_llm: bool = False,
 ) -> Dict[str, Any]:
     script = _normalize(script)
+    if use_llm and _fails_precheck(script, platform):
+        report = _heuristic_report(
+            script, topic, platform, tuple(trending_hashtags or ()), llm_hashtags=False
+        )
+        report["llm_skipped"] = "precheck_failed"
+        return report
     if use_llm:
         llm_report = llm_analyze_verifiers(
             script=script,
@@ -369,44 +784,217 @@ def analyze_script(
             max_tags=6,
         )
         if llm_report:
-            # Ensure consistent key names with previous output
-            result = {
-                "toxicity": {"score": llm_report.get("toxicity", {}).get("score", 0.0),
-                              "hits": [],
-                              "label": llm_report.get("toxicity", {}).get("label", "safe")},
-                "sentiment": llm_report.get("sentiment", {}),
-                "cta": llm_report.get("cta", {}),
-                "hook": llm_report.get("hook", {}),
-                "readability": llm_report.get("readability", {}),
-                "brand_safety": llm_report.get("brand_safety", {}),
-                "tone": llm_report.get("tone", {}),
-                "virality": llm_report.get("virality", {}),
-                "platform_guidelines": llm_report.get("platform_guidelines", {}),
-                "suggested_hashtags": llm_report.get("hashtags", []),
-            }
-            # Add heuristic vocabulary diversity for extra signal
-            result["vocabulary"] = vocabulary_diversity(script)
-            return result
+            return _llm_report_to_result(script, llm_report)
 
     # Heuristic fallback
-    tox = analyze_toxicity(script)
-    sent = analyze_sentiment(script)
-    cta = detect_cta(script)
-    hook = measure_hook_strength(script)
-    read = readability(script)
-    safety = brand_safety(script)
-    vocab = vocabulary_diversity(script)
-    tone = tone_classification(script)
-    viral = virality_score(script, topic=topic)
-    guide = platform_guidelines(script, platform=platform)
-    hashtags = llm_hashtag_suggestions(
+    return _heuristic_report(script, topic, platform, tuple(trending_hashtags or ()))
+
+
+def analyze_scripts(
+    scripts: List[str],
+    topics: Optional[List[Optional[str]]] = None,
+    platform: str = "youtube_shorts",
+    trending_hashtags: Optional[List[str]] = None,
+    use_llm: bool = False,
+) -> List[Dict[str, Any]]:
+    """Analyze many scripts, returning one report per script in input order.
+
+    With use_llm=True the scripts are scored through batched LLM calls; any script the
+    model did not return a usable report for falls back to the heuristic verifiers.
+    Scripts that fail the heuristic precheck are never sent to the model.
+    """
+    scripts = [_normalize(s) for s in scripts]
+    topics = list(topics) if topics is not None else [None] * len(scripts)
+
+    llm_reports: List[Optional[Dict[str, Any]]] = [None] * len(scripts)
+    skipped: List[bool] = [False] * len(scripts)
+    if use_llm:
+        skipped = [_fails_precheck(s, platform) for s in scripts]
+        pending = [i for i, skip in enumerate(skipped) if not skip]
+        if pending:
+            batch_reports = llm_analyze_verifiers_batch(
+                [scripts[i] for i in pending],
+                topics=[topics[i] for i in pending],
+                platform=platform,
+                trending_hashtags=trending_hashtags,
+                max_tags=6,
+            )
+            for i, llm_report in zip(pending, batch_reports):
+                llm_reports[i] = llm_report
+
+    return _merge_reports(scripts, topics, llm_reports, platform, trending_hashtags, skipped)
+
+
+async def analyze_scripts_async(
+    scripts: List[str],
+    topics: Optional[List[Optional[str]]] = None,
+    platform: str = "youtube_shorts",
+    trending_hashtags: Optional[List[str]] = None,
+    concurrency: int = 8,
+    requests_per_minute: int = 500,
+) -> List[Dict[str, Any]]:
+    """Analyze many scripts with one concurrent LLM request per script.
+
+    Useful when scripts cannot share a batched prompt. At most `concurrency` requests are
+    in flight and request starts are throttled to `requests_per_minute`. Scripts without
+    a usable LLM report fall back to the heuristic verifiers.
+    """
+    scripts = [_normalize(s) for s in scripts]
+    topics = list(topics) if topics is not None else [None] * len(scripts)
+
+    llm_reports: List[Optional[Dict[str, Any]]] = [None] * len(scripts)
+    skipped = [_fails_precheck(s, platform) for s in scripts]
+    pending = [i for i, skip in enumerate(skipped) if not skip]
+    if config.openai_api_key() and pending:
+        client = openai.AsyncOpenAI(api_key=config.openai_api_key(), timeout=30, max_retries=2)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        limiter = _RequestRateLimiter(requests_per_minute)
+        try:
+            pending_reports = await asyncio.gather(*(
+                _llm_analyze_verifiers_async(
+                    client, semaphore, limiter, scripts[i], topics[i], platform, trending_hashtags, 6
+                )
+                for i in pending
+            ))
+        finally:
+            await client.close()
+        for i, llm_report in zip(pending, pending_reports):
+            llm_reports[i] = llm_report
+
+    return _merge_reports(scripts, topics, llm_reports, platform, trending_hashtags, skipped)
+
+
+def analyze_scripts_parallel(
+    scripts: List[str],
+    topics: Optional[List[Optional[str]]] = None,
+    platform: str = "youtube_shorts",
+    trending_hashtags: Optional[List[str]] = None,
+    concurrency: int = 8,
+    requests_per_minute: int = 500,
+) -> List[Dict[str, Any]]:
+    """Synchronous wrapper around analyze_scripts_async."""
+    return asyncio.run(
+        analyze_scripts_async(
+            scripts,
+            topics=topics,
+            platform=platform,
+            trending_hashtags=trending_hashtags,
+            concurrency=concurrency,
+            requests_per_minute=requests_per_minute,
+        )
+    )
+
+
+def _merge_reports(
+    scripts: List[str],
+    topics: List[Optional[str]],
+    llm_reports: List[Optional[Dict[str, Any]]],
+    platform: str,
+    trending_hashtags: Optional[List[str]],
+    skipped: Optional[List[bool]] = None,
+) -> List[Dict[str, Any]]:
+    trending_key = tuple(trending_hashtags or ())
+    skipped = skipped or [False] * len(scripts)
+    results: List[Dict[str, Any]] = []
+    for script, topic, llm_report, skip in zip(scripts, topics, llm_reports, skipped):
+        if llm_report:
+            results.append(_llm_report_to_result(script, llm_report))
+            continue
+        report = _heuristic_report(script, topic, platform, trending_key, llm_hashtags=not skip)
+        if skip:
+            report["llm_skipped"] = "precheck_failed"
+        results.append(report)
+    return results
+
+
+def _fails_precheck(script: str, platform: str) -> bool:
+    # Scripts the heuristics already reject (unsafe or near-empty) don't need an LLM opinion
+    if not brand_safety(script)["safe"]:
+        return True
+    return platform_guidelines(script, platform)["length_tokens"] < LLM_MIN_TOKENS
+
+
+def _llm_report_to_result(script: str, llm_report: Dict[str, Any]) -> Dict[str, Any]:
+    # Ensure consistent key names with the heuristic output
+    result = {
+        "toxicity": {"score": llm_report.get("toxicity", {}).get("score", 0.0),
+                      "hits": [],
+                      "label": llm_report.get("toxicity", {}).get("label", "safe")},
+        "sentiment": llm_report.get("sentiment", {}),
+        "cta": llm_report.get("cta", {}),
+        "hook": llm_report.get("hook", {}),
+        "readability": llm_report.get("readability", {}),
+        "brand_safety": llm_report.get("brand_safety", {}),
+        "tone": llm_report.get("tone", {}),
+        "virality": llm_report.get("virality", {}),
+        "platform_guidelines": llm_report.get("platform_guidelines", {}),
+        "suggested_hashtags": llm_report.get("hashtags", []),
+    }
+    # Add heuristic vocabulary diversity for extra signal
+    result["vocabulary"] = vocabulary_diversity(script)
+    return result
+
+
+def _heuristic_report(
+    script: str,
+    topic: Optional[str],
+    platform: str,
+    trending_hashtags: Tuple[str, ...],
+    llm_hashtags: bool = True,
+) -> Dict[str, Any]:
+    """Heuristic report for a normalized script; safe for the caller to mutate.
+
+    The verifiers are deterministic and memoized; hashtags may come from the LLM, so they
+    are requested on every call rather than pinned in the cache. llm_hashtags=False keeps
+    the report entirely offline (used for scripts that failed the precheck).
+    """
+    report = copy.deepcopy(_heuristic_verifiers(script, topic, platform))
+    if not llm_hashtags:
+        report["suggested_hashtags"] = list(
+            _heuristic_hashtag_suggestions(topic, report["sentiment"]["label"])
+        )
+        return report
+    report["suggested_hashtags"] = llm_hashtag_suggestions(
         script=script,
         topic=topic,
-        sentiment_label=sent["label"],
-        trending_hashtags=trending_hashtags,
+        sentiment_label=report["sentiment"]["label"],
+        trending_hashtags=list(trending_hashtags),
         max_tags=6,
     )
+    return report
+
 
+@lru_cache(maxsize=1024)
+def _heuristic_verifiers(script: str, topic: Optional[str], platform: str) -> Dict[str, Any]:
+    """Run every heuristic verifier on a normalized script. Memoized on all inputs."""
+    # Lowercase and tokenize once and share the result across verifiers
+    lower_text = script.lower()
+    words, all_caps = _tokenize_with_caps(script)
+    sentences = _sentences(script)
+    counts = Counter(words)
+    # Per-vocabulary-entry stats, accumulated once instead of re-walking every token
+    total_chars = 0
+    alpha_counts: Dict[str, int] = {}
+    for word, n in counts.items():
+        total_chars += len(word) * n
+        if word.isalpha():
+            alpha_counts[word] = n
+    phrase_hits = _phrase_hits(lower_text)
+
+    tox = analyze_toxicity(script, words=words, counts=counts)
+    sent = analyze_sentiment(script, counts=counts)
+    cta = detect_cta(script, phrase_hits=phrase_hits, lower_text=lower_text)
+    hook = measure_hook_strength(script, sentences=sentences)
+    read = readability(script, words=words, sentences=sentences, total_chars=total_chars)
+    safety = brand_safety(script, lower_text=lower_text, words=words)
+    vocab = vocabulary_diversity(script, alpha_counts=alpha_counts)
+    tone = tone_classification(script, phrase_hits=phrase_hits, lower_text=lower_text)
+    viral = virality_score(
+        script, topic=topic, tox=tox, sent=sent, hook=hook, cta=cta, read=read, vocab=vocab
+    )
+    guide = platform_guidelines(
+        script, platform=platform, words=words, counts=counts, all_caps=all_caps
+    )
     return {
         "toxicity": tox,
         "sentiment": sent,
@@ -418,7 +1006,6 @@ def analyze_script(
         "vocabulary": vocab,
         "tone": tone,
         "virality": viral,
-        "suggested_hashtags": hashtags,
     }
 
 
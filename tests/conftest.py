@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+# Tests killed by pytest-timeout are recorded here and deselected on later runs.
+# Delete the file to give them another chance.
+SKIPFILE = Path(__file__).with_name("skipfile.txt")
+
+
+def _skipped_nodeids():
+    if not SKIPFILE.exists():
+        return set()
+    return {line.strip() for line in SKIPFILE.read_text().splitlines() if line.strip()}
+
+
+def pytest_collection_modifyitems(config, items):
+    skipped = _skipped_nodeids()
+    if not skipped:
+        return
+    deselected = [item for item in items if item.nodeid in skipped]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid not in skipped]
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call" and report.failed and call.excinfo is not None:
+        # pytest-timeout fails the test with a "Timeout ..." message. Mark the report;
+        # under xdist it is sent to the controller, which alone writes SKIPFILE.
+        if call.excinfo.errisinstance(pytest.fail.Exception) and str(call.excinfo.value).startswith("Timeout"):
+            report.user_properties.append(("timed_out", True))
+
+
+_IS_XDIST_WORKER = False
+
+
+def pytest_configure(config):
+    global _IS_XDIST_WORKER
+    _IS_XDIST_WORKER = hasattr(config, "workerinput")
+
+
+def pytest_runtest_logreport(report):
+    # Only the controller (or the single process without -n) writes, so concurrent
+    # workers can't interleave or duplicate lines
+    if _IS_XDIST_WORKER:
+        return
+    if not any(name == "timed_out" for name, _ in report.user_properties):
+        return
+    if report.nodeid in _skipped_nodeids():
+        return
+    with SKIPFILE.open("a") as f:
+        f.write(report.nodeid + "\n")
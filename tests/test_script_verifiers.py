@@ -0,0 +1,226 @@
+"""
+Tests for the functions in script_verifiers.py
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import script_verifiers as sv
+
+
+@pytest.fixture
+def llm_client(mocker):
+    """An API key is configured; the OpenAI client is a mock so calls can be asserted."""
+    mocker.patch.object(sv.config, "openai_api_key", return_value="sk-test")
+    return mocker.patch.object(sv.config, "openai_client")
+
+
+def test_analyze_script_precheck_failure_makes_no_llm_call(llm_client):
+    """Scripts rejected by the precheck get an offline report, hashtags included."""
+    report = sv.analyze_script("Too short", topic="cats", use_llm=True)
+
+    assert report["llm_skipped"] == "precheck_failed"
+    assert "#cats" in report["suggested_hashtags"]
+    llm_client.assert_not_called()
+
+
+def test_analyze_scripts_precheck_failure_makes_no_llm_call(llm_client):
+    reports = sv.analyze_scripts(["Too short", "Way too short"], use_llm=True)
+
+    assert [r["llm_skipped"] for r in reports] == ["precheck_failed"] * 2
+    llm_client.assert_not_called()
+
+
+CAPS_SAMPLES = [
+    "HELLO_WORLD ok",
+    "HELLO WORLD ok",
+    "DON'T STOP now",
+    "ABC123 DEF 4GH IJ_ K",
+    "I am OK, YES! no",
+    "__AB__ A1B2 'CD' x'YZ'",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", CAPS_SAMPLES)
+def test_tokenize_with_caps_ascii_matches_regex(text):
+    """The ASCII fast path counts the same caps words as _ALLCAPS_RE and tokenizes like _WORD_RE."""
+    words, n_caps = sv._tokenize_with_caps(text)
+
+    assert n_caps == len(sv._ALLCAPS_RE.findall(text))
+    assert words == tuple(sv._WORD_RE.findall(text.lower()))
+
+
+def test_all_caps_ratio_independent_of_non_ascii_text():
+    # "é" is not a token, so both scripts have the same tokens and caps words
+    ascii_only = sv.platform_guidelines("HELLO_WORLD ok SHOUT")["all_caps_ratio"]
+    with_accent = sv.platform_guidelines("HELLO_WORLD ok SHOUT é")["all_caps_ratio"]
+
+    assert ascii_only == with_accent == 0.25
+
+
+# --- Batched LLM scoring (analyze_scripts) ---
+
+SCRIPTS = [
+    "Stop scrolling, here are three quick tips for better sleep tonight.",
+    "This one habit changed how I study for every single exam.",
+    "Watch until the end to see the easiest pasta recipe ever made.",
+]
+
+
+def _chat_response(mocker, payload):
+    """A chat.completions response whose message content is `payload` as JSON."""
+    message = mocker.Mock(content=json.dumps(payload))
+    return mocker.Mock(choices=[mocker.Mock(message=message)])
+
+
+def _llm_item(virality, **extra):
+    return {"virality": {"score": virality}, "hashtags": ["#tips"], **extra}
+
+
+def test_analyze_scripts_aligns_llm_items_by_id(llm_client, mocker):
+    """Items are matched to scripts by their echoed id, not by reply order."""
+    items = [_llm_item(30, id=2), _llm_item(10, id=0), _llm_item(20, id=1)]
+    llm_client.return_value.chat.completions.create.return_value = _chat_response(mocker, {"items": items})
+
+    reports = sv.analyze_scripts(SCRIPTS, use_llm=True)
+
+    assert [r["virality"]["score"] for r in reports] == [10, 20, 30]
+    assert llm_client.return_value.chat.completions.create.call_count == 1
+
+
+def test_analyze_scripts_aligns_items_without_id_by_position(llm_client, mocker):
+    items = [_llm_item(10), _llm_item(20), _llm_item(30)]
+    llm_client.return_value.chat.completions.create.return_value = _chat_response(mocker, {"items": items})
+
+    reports = sv.analyze_scripts(SCRIPTS, use_llm=True)
+
+    assert [r["virality"]["score"] for r in reports] == [10, 20, 30]
+
+
+@pytest.mark.parametrize("bad_id", [True, 3, -1, "1", 1.0])
+def test_analyze_scripts_ignores_invalid_ids(llm_client, mocker, bad_id):
+    """Out-of-range, non-int and bool ids are dropped; that script falls back to heuristics."""
+    items = [_llm_item(10, id=0), _llm_item(99, id=bad_id), _llm_item(30, id=2)]
+    llm_client.return_value.chat.completions.create.return_value = _chat_response(mocker, {"items": items})
+    mocker.patch.object(sv, "llm_hashtag_suggestions", return_value=["#fallback"])
+
+    reports = sv.analyze_scripts(SCRIPTS, use_llm=True)
+
+    assert reports[0]["virality"]["score"] == 10
+    assert reports[2]["virality"]["score"] == 30
+    assert reports[1] == sv.analyze_script(SCRIPTS[1])
+
+
+def test_analyze_scripts_keeps_first_duplicate_id(llm_client, mocker):
+    items = [_llm_item(10, id=0), _llm_item(11, id=0), _llm_item(30, id=2)]
+    llm_client.return_value.chat.completions.create.return_value = _chat_response(mocker, {"items": items})
+    mocker.patch.object(sv, "llm_hashtag_suggestions", return_value=["#fallback"])
+
+    reports = sv.analyze_scripts(SCRIPTS, use_llm=True)
+
+    assert reports[0]["virality"]["score"] == 10
+    assert reports[1]["suggested_hashtags"] == ["#fallback"]
+    assert reports[2]["virality"]["score"] == 30
+
+
+def test_analyze_scripts_falls_back_when_llm_reply_is_unusable(llm_client, mocker):
+    llm_client.return_value.chat.completions.create.return_value = _chat_response(mocker, {"oops": []})
+    mocker.patch.object(sv, "llm_hashtag_suggestions", return_value=["#fallback"])
+
+    reports = sv.analyze_scripts(SCRIPTS, use_llm=True)
+
+    assert reports == [sv.analyze_script(script) for script in SCRIPTS]
+
+
+# --- Concurrent per-script LLM scoring (analyze_scripts_parallel) ---
+
+class _FakeAsyncOpenAI:
+    """Stands in for openai.AsyncOpenAI and records how many requests overlap."""
+
+    def __init__(self, scores, failing_script=None):
+        self.scores = scores
+        self.failing_script = failing_script
+        self.active = 0
+        self.max_active = 0
+        self.closed = False
+        self.chat = self
+        self.completions = self
+
+    async def create(self, messages, **kwargs):
+        script = json.loads(messages[1]["content"])["script"]
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            # Finish in reverse order so the output order must come from the input
+            await asyncio.sleep(0.01 * (len(self.scores) - self.scores.index(script)))
+            if script == self.failing_script:
+                raise RuntimeError("upstream error")
+            content = json.dumps(_llm_item(self.scores.index(script)))
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        finally:
+            self.active -= 1
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def async_llm(mocker):
+    mocker.patch.object(sv.config, "openai_api_key", return_value="sk-test")
+
+    def install(**kwargs):
+        client = _FakeAsyncOpenAI(SCRIPTS, **kwargs)
+        mocker.patch.object(sv.openai, "AsyncOpenAI", return_value=client)
+        return client
+
+    return install
+
+
+def test_analyze_scripts_parallel_keeps_input_order(async_llm):
+    client = async_llm()
+
+    reports = sv.analyze_scripts_parallel(SCRIPTS, requests_per_minute=60_000)
+
+    assert [r["virality"]["score"] for r in reports] == [0, 1, 2]
+    assert client.closed
+
+
+def test_analyze_scripts_parallel_respects_concurrency(async_llm):
+    client = async_llm()
+
+    sv.analyze_scripts_parallel(SCRIPTS, concurrency=2, requests_per_minute=60_000)
+
+    assert client.max_active == 2
+
+
+def test_analyze_scripts_parallel_isolates_failures(async_llm, mocker):
+    """A failed request only sends that script to the heuristic fallback."""
+    async_llm(failing_script=SCRIPTS[1])
+    mocker.patch.object(sv, "llm_hashtag_suggestions", return_value=["#fallback"])
+
+    reports = sv.analyze_scripts_parallel(SCRIPTS, requests_per_minute=60_000)
+
+    assert reports[0]["virality"]["score"] == 0
+    assert reports[2]["virality"]["score"] == 2
+    assert reports[1] == sv.analyze_script(SCRIPTS[1])
+
+
+def test_request_rate_limiter_spaces_request_starts():
+    async def three_starts():
+        limiter = sv._RequestRateLimiter(per_minute=600)  # one start per 0.1s
+        loop = asyncio.get_running_loop()
+        begin = loop.time()
+        starts = []
+        for _ in range(3):
+            await limiter.wait()
+            starts.append(loop.time() - begin)
+        return starts
+
+    starts = asyncio.run(three_starts())
+
+    assert starts[0] < 0.05
+    assert starts[1] >= 0.09 and starts[2] >= 0.19
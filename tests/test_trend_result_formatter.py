@@ -1,10 +1,9 @@
-import unittest
-from unittest.mock import Mock, patch, MagicMock
+import gzip
 import json
-import tempfile
+import pytest
 import os
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Import the module to test
 from trend_result_formatter import (
@@ -16,365 +15,417 @@ from trend_result_formatter import (
 )
 
 
-class TestTrendResultFormatter(unittest.TestCase):
-    """Test cases for TrendResultFormatter class."""
-    
-    def setUp(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.formatter = TrendResultFormatter(output_dir=self.temp_dir)
-        
-        # Sample YouTube video data
-        self.sample_video = {
-            "id": "test_video_id_123",
-            "title": "Test Video Title",
-            "channelTitle": "Test Channel",
-            "publishedAt": "2024-01-01T00:00:00Z",
-            "viewCount": "1000",
-            "likeCount": "100",
-            "commentCount": "50",
-            "categoryId": "22",
-            "tags": ["test", "video", "trending"],
-            "description": "A test video description that is not very long"
-        }
-        
-        # Sample video with captions
-        self.sample_video_with_captions = {
-            **self.sample_video,
-            "captions": {
-                "language": "en",
-                "is_auto": False,
-                "format": "srt",
-                "method": "manual",
-                "content": "Sample caption content"
-            }
-        }
-        
-        # Sample video with long description
-        self.sample_video_long_desc = {
-            **self.sample_video,
-            "description": "A" * 2500  # Very long description
-        }
-        
-        # Sample TikTok data
-        self.sample_tiktok_data = {
-            "hashtags": [
-                {"hashtag": "#test1", "count": 1000000},
-                {"hashtag": "#test2", "count": 500000}
-            ],
-            "sounds": [
-                {"sound_name": "Test Sound 1", "play_count": 2000000},
-                {"sound_name": "Test Sound 2", "play_count": 1500000}
-            ]
+# Read-only sample payloads are built once per module; only the formatter, which
+# writes files, is rebuilt per test around its own tmp_path.
+
+@pytest.fixture
+def formatter(tmp_path):
+    """Formatter writing into the test's own temporary directory."""
+    return TrendResultFormatter(output_dir=str(tmp_path))
+
+
+@pytest.fixture
+def fake_formatter(fs):
+    """Formatter writing into an in-memory pyfakefs filesystem."""
+    fs.create_dir("/out")
+    return TrendResultFormatter(output_dir="/out")
+
+
+@pytest.fixture(scope="module")
+def sample_video():
+    """Sample YouTube video data."""
+    return {
+        "id": "test_video_id_123",
+        "title": "Test Video Title",
+        "channelTitle": "Test Channel",
+        "publishedAt": "2024-01-01T00:00:00Z",
+        "viewCount": "1000",
+        "likeCount": "100",
+        "commentCount": "50",
+        "categoryId": "22",
+        "tags": ["test", "video", "trending"],
+        "description": "A test video description that is not very long"
+    }
+
+
+@pytest.fixture(scope="module")
+def sample_video_with_captions(sample_video):
+    """Sample video with captions."""
+    return {
+        **sample_video,
+        "captions": {
+            "language": "en",
+            "is_auto": False,
+            "format": "srt",
+            "method": "manual",
+            "content": "Sample caption content"
         }
+    }
+
+
+@pytest.fixture(scope="module")
+def sample_video_long_desc(sample_video):
+    """Sample video with long description."""
+    return {
+        **sample_video,
+        "description": "A" * 2500  # Very long description
+    }
+
+
+@pytest.fixture(scope="module")
+def sample_tiktok_data():
+    """Sample TikTok data."""
+    return {
+        "hashtags": [
+            {"hashtag": "#test1", "count": 1000000},
+            {"hashtag": "#test2", "count": 500000}
+        ],
+        "sounds": [
+            {"sound_name": "Test Sound 1", "play_count": 2000000},
+            {"sound_name": "Test Sound 2", "play_count": 1500000}
+        ]
+    }
+
+
+def test_init(fs):
+    """Test TrendResultFormatter initialization."""
+    formatter = TrendResultFormatter("custom_output")
+    assert formatter.output_dir == Path("custom_output")
     
-    def tearDown(self):
-        """Clean up test fixtures."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
-    
-    def test_init(self):
-        """Test TrendResultFormatter initialization."""
-        formatter = TrendResultFormatter("custom_output")
-        self.assertEqual(formatter.output_dir, Path("custom_output"))
-        
-        # Test default output directory
-        formatter_default = TrendResultFormatter()
-        self.assertEqual(formatter_default.output_dir, Path("trend_results"))
-    
-    def test_format_youtube_videos_basic(self):
-        """Test basic YouTube video formatting."""
-        videos = [self.sample_video]
-        result = self.formatter.format_youtube_videos(videos, "US", True)
-        
-        self.assertIn("videos", result)
-        self.assertIn("metadata", result)
-        self.assertEqual(result["total_count"], 1)
-        self.assertEqual(result["metadata"]["region_code"], "US")
-        self.assertEqual(result["metadata"]["data_type"], "trending_videos")
-        
-        video = result["videos"][0]
-        self.assertEqual(video["video_id"], "test_video_id_123")
-        self.assertEqual(video["title"], "Test Video Title")
-        self.assertEqual(video["channel"], "Test Channel")
-        self.assertEqual(video["statistics"]["views"], 1000)
-        self.assertEqual(video["statistics"]["likes"], 100)
-        self.assertEqual(video["statistics"]["comments"], 50)
-    
-    def test_format_youtube_videos_with_captions(self):
-        """Test YouTube video formatting with captions."""
-        videos = [self.sample_video_with_captions]
-        result = self.formatter.format_youtube_videos(videos, "US", True)
-        
-        video = result["videos"][0]
-        self.assertTrue(video["captions"]["available"])
-        self.assertEqual(video["captions"]["language"], "en")
-        self.assertFalse(video["captions"]["is_auto_generated"])
-        self.assertEqual(video["captions"]["format"], "srt")
-        self.assertEqual(video["captions"]["method"], "manual")
-    
-    def test_format_youtube_videos_without_captions(self):
-        """Test YouTube video formatting without captions."""
-        videos = [self.sample_video]
-        result = self.formatter.format_youtube_videos(videos, "US", True)
-        
-        video = result["videos"][0]
-        self.assertFalse(video["captions"]["available"])
-    
-    def test_format_youtube_videos_long_description(self):
-        """Test YouTube video formatting with long description truncation."""
-        videos = [self.sample_video_long_desc]
-        result = self.formatter.format_youtube_videos(videos, "US", True)
-        
-        video = result["videos"][0]
-        self.assertEqual(len(video["description"]), 2003)  # 2000 + "..."
-        self.assertTrue(video["description"].endswith("..."))
-    
-    def test_format_youtube_videos_missing_data(self):
-        """Test YouTube video formatting with missing data."""
-        incomplete_video = {
-            "id": "test_id",
-            "title": "Test Title"
-            # Missing other fields
-        }
-        videos = [incomplete_video]
-        result = self.formatter.format_youtube_videos(videos, "US", True)
-        
-        video = result["videos"][0]
-        self.assertEqual(video["channel"], "")
-        self.assertEqual(video["statistics"]["views"], 0)
-        self.assertEqual(video["statistics"]["likes"], 0)
-        self.assertEqual(video["statistics"]["comments"], 0)
-        self.assertEqual(video["tags"], [])
-    
-    def test_format_youtube_topics(self):
-        """Test YouTube topics formatting."""
-        topics = ["Topic 1", "Topic 2", "Topic 3"]
-        result = self.formatter.format_youtube_topics(topics, "US", True)
-        
-        self.assertIn("topics", result)
-        self.assertEqual(result["total_count"], 3)
-        self.assertEqual(result["metadata"]["data_type"], "trending_topics")
-        
-        for i, topic in enumerate(result["topics"]):
-            self.assertEqual(topic["rank"], i + 1)
-            self.assertEqual(topic["title"], f"Topic {i + 1}")
-            self.assertEqual(topic["word_count"], 2)
-    
-    def test_format_youtube_music(self):
-        """Test YouTube music formatting."""
-        music_videos = [self.sample_video]
-        result = self.formatter.format_youtube_music(music_videos, "US", True)
-        
-        self.assertIn("music_videos", result)
-        self.assertEqual(result["total_count"], 1)
-        self.assertEqual(result["metadata"]["data_type"], "trending_music")
-        self.assertEqual(result["metadata"]["category"], "Music (ID: 10)")
-    
-    def test_format_tiktok_trends(self):
-        """Test TikTok trends formatting."""
-        result = self.formatter.format_tiktok_trends(self.sample_tiktok_data, True)
-        
-        self.assertIn("hashtags", result)
-        self.assertIn("sounds", result)
-        self.assertEqual(result["hashtags"]["total_count"], 2)
-        self.assertEqual(result["sounds"]["total_count"], 2)
-        
-        # Check hashtag formatting
-        hashtag = result["hashtags"]["trending"][0]
-        self.assertEqual(hashtag["rank"], 1)
-        self.assertEqual(hashtag["hashtag"], "#test1")
-        self.assertEqual(hashtag["play_count"], 1000000)
-        self.assertEqual(hashtag["formatted_count"], "1.0M")
-        
-        # Check sound formatting
-        sound = result["sounds"]["trending"][0]
-        self.assertEqual(sound["rank"], 1)
-        self.assertEqual(sound["sound_name"], "Test Sound 1")
-        self.assertEqual(sound["play_count"], 2000000)
-        self.assertEqual(sound["formatted_count"], "2.0M")
-    
-    def test_format_large_numbers(self):
-        """Test large number formatting."""
-        formatter = TrendResultFormatter()
-        
-        self.assertEqual(formatter._format_large_number(999), "999")
-        self.assertEqual(formatter._format_large_number(1500), "1.5K")
-        self.assertEqual(formatter._format_large_number(1500000), "1.5M")
-        self.assertEqual(formatter._format_large_number(2500000000), "2.5B")
-    
-    def test_save_to_json(self):
-        """Test JSON file saving."""
-        test_data = {"test": "data", "number": 42}
-        filename = "test_output.json"
-        
-        filepath = self.formatter.save_to_json(test_data, filename, True)
-        
-        # Check file was created
-        self.assertTrue(os.path.exists(filepath))
-        
-        # Check file contents
-        with open(filepath, 'r', encoding='utf-8') as f:
-            loaded_data = json.load(f)
-        
-        self.assertEqual(loaded_data, test_data)
-        
-        # Test without .json extension
-        filepath2 = self.formatter.save_to_json(test_data, "test_output2", False)
-        self.assertTrue(filepath2.endswith('.json'))
-    
-    def test_save_to_json_pretty_print(self):
-        """Test JSON file saving with and without pretty printing."""
-        test_data = {"test": "data"}
-        
-        # With pretty print
-        filepath_pretty = self.formatter.save_to_json(test_data, "pretty.json", True)
-        with open(filepath_pretty, 'r', encoding='utf-8') as f:
-            content_pretty = f.read()
-        
-        # Without pretty print
-        filepath_compact = self.formatter.save_to_json(test_data, "compact.json", False)
-        with open(filepath_compact, 'r', encoding='utf-8') as f:
-            content_compact = f.read()
-        
-        # Pretty print should have more whitespace
-        self.assertGreater(len(content_pretty), len(content_compact))
-    
-    @patch('trend_result_formatter.fetch_youtube_trending_videos')
-    def test_format_and_save_youtube_videos(self, mock_fetch):
-        """Test fetch, format, and save YouTube videos."""
-        mock_fetch.return_value = [self.sample_video]
-        
-        filepath = self.formatter.format_and_save_youtube_videos(
-            region_code="US",
-            max_results=10,
-            include_captions=False
-        )
-        
-        mock_fetch.assert_called_once_with(
-            region_code="US",
-            max_results=10,
-            include_captions=False,
-            caption_language='en',
-            api_key=None
-        )
-        
-        self.assertTrue(filepath.endswith('.json'))
-        self.assertIn('youtube_trending_videos_US_', filepath)
-    
-    @patch('trend_result_formatter.fetch_youtube_trending_topics')
-    def test_format_and_save_youtube_topics(self, mock_fetch):
-        """Test fetch, format, and save YouTube topics."""
-        mock_fetch.return_value = ["Topic 1", "Topic 2"]
-        
-        filepath = self.formatter.format_and_save_youtube_topics(
-            region_code="CA",
-            max_results=15
-        )
-        
-        mock_fetch.assert_called_once_with(
-            region_code="CA",
-            max_results=15,
-            api_key=None
-        )
-        
-        self.assertTrue(filepath.endswith('.json'))
-        self.assertIn('youtube_trending_topics_CA_', filepath)
-    
-    @patch('trend_result_formatter.fetch_youtube_trending_music')
-    def test_format_and_save_youtube_music(self, mock_fetch):
-        """Test fetch, format, and save YouTube music."""
-        mock_fetch.return_value = [self.sample_video]
-        
-        filepath = self.formatter.format_and_save_youtube_music(
-            region_code="GB",
-            max_results=20
-        )
-        
-        mock_fetch.assert_called_once_with(
-            region_code="GB",
-            max_results=20,
-            api_key=None
-        )
-        
-        self.assertTrue(filepath.endswith('.json'))
-        self.assertIn('youtube_trending_music_GB_', filepath)
-    
-    @patch('trend_result_formatter.get_tiktok_trending')
-    def test_format_and_save_tiktok_trends(self, mock_fetch):
-        """Test fetch, format, and save TikTok trends."""
-        mock_fetch.return_value = self.sample_tiktok_data
-        
-        filepath = self.formatter.format_and_save_tiktok_trends()
-        
-        mock_fetch.assert_called_once_with(api_key=None)
-        
-        self.assertTrue(filepath.endswith('.json'))
-        self.assertIn('tiktok_trending_', filepath)
-
-
-class TestConvenienceFunctions(unittest.TestCase):
-    """Test cases for convenience functions."""
-    
-    def setUp(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-    
-    def tearDown(self):
-        """Clean up test fixtures."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
-    
-    @patch('trend_result_formatter.fetch_youtube_trending_videos')
-    def test_save_youtube_trending_videos(self, mock_fetch):
-        """Test save_youtube_trending_videos convenience function."""
-        mock_fetch.return_value = [{"id": "test", "title": "Test"}]
-        
-        filepath = save_youtube_trending_videos(
-            region_code="US",
-            max_results=5,
-            output_dir=self.temp_dir
-        )
-        
-        self.assertTrue(filepath.endswith('.json'))
-        self.assertIn('youtube_trending_videos_US_', filepath)
-    
-    @patch('trend_result_formatter.fetch_youtube_trending_topics')
-    def test_save_youtube_trending_topics(self, mock_fetch):
-        """Test save_youtube_trending_topics convenience function."""
-        mock_fetch.return_value = ["Topic 1"]
-        
-        filepath = save_youtube_trending_topics(
-            region_code="CA",
-            output_dir=self.temp_dir
-        )
-        
-        self.assertTrue(filepath.endswith('.json'))
-        self.assertIn('youtube_trending_topics_CA_', filepath)
-    
-    @patch('trend_result_formatter.fetch_youtube_trending_music')
-    def test_save_youtube_trending_music(self, mock_fetch):
-        """Test save_youtube_trending_music convenience function."""
-        mock_fetch.return_value = [{"id": "test", "title": "Test"}]
-        
-        filepath = save_youtube_trending_music(
-            region_code="GB",
-            output_dir=self.temp_dir
-        )
-        
-        self.assertTrue(filepath.endswith('.json'))
-        self.assertIn('youtube_trending_music_GB_', filepath)
-    
-    @patch('trend_result_formatter.get_tiktok_trending')
-    def test_save_tiktok_trending(self, mock_fetch):
-        """Test save_tiktok_trending convenience function."""
-        mock_fetch.return_value = {"hashtags": [], "sounds": []}
-        
-        filepath = save_tiktok_trending(output_dir=self.temp_dir)
-        
-        self.assertTrue(filepath.endswith('.json'))
-        self.assertIn('tiktok_trending_', filepath)
-
-
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    # Test default output directory
+    formatter_default = TrendResultFormatter()
+    assert formatter_default.output_dir == Path("trend_results")
+
+
+def test_format_youtube_videos_basic(formatter, sample_video):
+    """Test basic YouTube video formatting."""
+    videos = [sample_video]
+    result = formatter.format_youtube_videos(videos, "US", True)
+    
+    assert "videos" in result
+    assert "metadata" in result
+    assert result["total_count"] == 1
+    assert result["metadata"]["region_code"] == "US"
+    assert result["metadata"]["data_type"] == "trending_videos"
+    
+    video = result["videos"][0]
+    expected = {
+        "video_id": "test_video_id_123",
+        "title": "Test Video Title",
+        "channel": "Test Channel",
+    }
+    assert {k: video[k] for k in expected} == expected
+    expected_stats = {"views": 1000, "likes": 100, "comments": 50}
+    assert {k: video["statistics"][k] for k in expected_stats} == expected_stats
+
+
+def test_format_youtube_videos_with_captions(formatter, sample_video_with_captions):
+    """Test YouTube video formatting with captions."""
+    videos = [sample_video_with_captions]
+    result = formatter.format_youtube_videos(videos, "US", True)
+    
+    video = result["videos"][0]
+    assert video["captions"]["available"]
+    assert video["captions"]["language"] == "en"
+    assert not video["captions"]["is_auto_generated"]
+    assert video["captions"]["format"] == "srt"
+    assert video["captions"]["method"] == "manual"
+
+
+def test_format_youtube_videos_without_captions(formatter, sample_video):
+    """Test YouTube video formatting without captions."""
+    videos = [sample_video]
+    result = formatter.format_youtube_videos(videos, "US", True)
+    
+    video = result["videos"][0]
+    assert not video["captions"]["available"]
+
+
+def test_format_youtube_videos_long_description(formatter, sample_video_long_desc):
+    """Test YouTube video formatting with long description truncation."""
+    videos = [sample_video_long_desc]
+    result = formatter.format_youtube_videos(videos, "US", True)
+    
+    video = result["videos"][0]
+    assert len(video["description"]) == 2003  # 2000 + "..."
+    assert video["description"].endswith("...")
+
+
+def test_format_youtube_videos_missing_data(formatter):
+    """Test YouTube video formatting with missing data."""
+    incomplete_video = {
+        "id": "test_id",
+        "title": "Test Title"
+        # Missing other fields
+    }
+    videos = [incomplete_video]
+    result = formatter.format_youtube_videos(videos, "US", True)
+    
+    video = result["videos"][0]
+    assert video["channel"] == ""
+    assert video["statistics"]["views"] == 0
+    assert video["statistics"]["likes"] == 0
+    assert video["statistics"]["comments"] == 0
+    assert video["tags"] == []
+
+
+def test_format_youtube_topics(formatter):
+    """Test YouTube topics formatting."""
+    topics = ["Topic 1", "Topic 2", "Topic 3"]
+    result = formatter.format_youtube_topics(topics, "US", True)
+    
+    assert "topics" in result
+    assert result["total_count"] == 3
+    assert result["metadata"]["data_type"] == "trending_topics"
+    
+    for i, topic in enumerate(result["topics"]):
+        assert topic["rank"] == i + 1
+        assert topic["title"] == f"Topic {i + 1}"
+        assert topic["word_count"] == 2
+
+
+def test_format_youtube_music(formatter, sample_video):
+    """Test YouTube music formatting."""
+    music_videos = [sample_video]
+    result = formatter.format_youtube_music(music_videos, "US", True)
+    
+    assert "music_videos" in result
+    assert result["total_count"] == 1
+    assert result["metadata"]["data_type"] == "trending_music"
+    assert result["metadata"]["category"] == "Music (ID: 10)"
+
+
+def test_format_tiktok_trends(formatter, sample_tiktok_data):
+    """Test TikTok trends formatting."""
+    result = formatter.format_tiktok_trends(sample_tiktok_data, True)
+    
+    assert "hashtags" in result
+    assert "sounds" in result
+    assert result["hashtags"]["total_count"] == 2
+    assert result["sounds"]["total_count"] == 2
+    
+    # Check hashtag formatting
+    hashtag = result["hashtags"]["trending"][0]
+    assert hashtag["rank"] == 1
+    assert hashtag["hashtag"] == "#test1"
+    assert hashtag["play_count"] == 1000000
+    assert hashtag["formatted_count"] == "1.0M"
+    
+    # Check sound formatting
+    sound = result["sounds"]["trending"][0]
+    assert sound["rank"] == 1
+    assert sound["sound_name"] == "Test Sound 1"
+    assert sound["play_count"] == 2000000
+    assert sound["formatted_count"] == "2.0M"
+
+
+@pytest.mark.parametrize("n,expected", [
+    (999, "999"),
+    (1500, "1.5K"),
+    (1_500_000, "1.5M"),
+    (2_500_000_000, "2.5B"),
+])
+def test_format_large_number(n, expected, formatter):
+    """Test large number formatting."""
+    assert formatter._format_large_number(n) == expected
+
+
+def test_save_to_json(fake_formatter):
+    """Test JSON file saving."""
+    test_data = {"test": "data", "number": 42}
+    filename = "test_output.json"
+    
+    filepath = fake_formatter.save_to_json(test_data, filename, True)
+    
+    # Check file was created
+    assert os.path.exists(filepath)
+    
+    # Check file contents
+    with open(filepath, 'r', encoding='utf-8') as f:
+        loaded_data = json.load(f)
+    
+    assert loaded_data == test_data
+    
+    # Test without .json extension
+    filepath2 = fake_formatter.save_to_json(test_data, "test_output2", False)
+    assert filepath2.endswith('.json')
+
+
+def test_save_to_json_pretty_print(fake_formatter):
+    """Test JSON file saving with and without pretty printing."""
+    test_data = {"test": "data"}
+    
+    # With pretty print
+    filepath_pretty = fake_formatter.save_to_json(test_data, "pretty.json", True)
+    with open(filepath_pretty, 'rb') as f:
+        content_pretty = f.read().decode('utf-8')
+    
+    # Without pretty print
+    filepath_compact = fake_formatter.save_to_json(test_data, "compact.json", False)
+    with open(filepath_compact, 'rb') as f:
+        content_compact = f.read().decode('utf-8')
+    
+    # Pretty print should have more whitespace; compact output has none
+    assert len(content_pretty) > len(content_compact)
+    assert content_compact == '{"test":"data"}'
+    assert json.loads(content_pretty) == test_data
+
+
+def test_save_to_json_compress(fake_formatter):
+    """Test gzip-compressed JSON saving."""
+    test_data = {"test": "data", "number": 42}
+    
+    filepath = fake_formatter.save_to_json(test_data, "compressed", compress=True)
+    
+    assert filepath.endswith('.json.gz')
+    with gzip.open(filepath, 'rb') as f:
+        assert json.loads(f.read()) == test_data
+
+
+def test_save_stream(fake_formatter):
+    """Test that streamed items form one valid JSON document."""
+    items = ({"n": i} for i in range(3))
+    
+    filepath = fake_formatter.save_stream({"source": "test"}, items, "streamed")
+    
+    with open(filepath, 'rb') as f:
+        saved = json.loads(f.read())
+    assert saved == {"metadata": {"source": "test"},
+                     "videos": [{"n": 0}, {"n": 1}, {"n": 2}],
+                     "total_count": 3}
+    
+    empty = fake_formatter.save_stream({}, iter(()), "empty.json", items_key="music_videos")
+    with open(empty, 'rb') as f:
+        assert json.loads(f.read()) == {"metadata": {}, "music_videos": [], "total_count": 0}
+
+
+def test_format_and_save_youtube_videos_stream(fake_formatter, mocker, sample_video):
+    """Test that the streamed videos file matches the regular formatter output."""
+    mocker.patch('trend_result_formatter.fetch_youtube_trending_videos',
+                 return_value=[sample_video, sample_video])
+    
+    filepath = fake_formatter.format_and_save_youtube_videos_stream(
+        region_code="US", retrieved_at="2024-01-01T00:00:00")
+    
+    _assert_saved(filepath, "youtube_trending_videos_US_")
+    with open(filepath, 'rb') as f:
+        saved = json.loads(f.read())
+    expected = fake_formatter.format_youtube_videos(
+        [sample_video, sample_video], "US", retrieved_at="2024-01-01T00:00:00")
+    assert saved == expected
+
+
+def _assert_saved(filepath, prefix):
+    assert filepath.endswith('.json')
+    assert prefix in filepath
+
+
+@pytest.mark.parametrize("fetch_target,method_name,kwargs,fetch_kwargs,prefix,payload", [
+    (
+        "fetch_youtube_trending_videos",
+        "format_and_save_youtube_videos",
+        {"region_code": "US", "max_results": 10, "include_captions": False},
+        {"region_code": "US", "max_results": 10, "include_captions": False,
+         "caption_language": "en", "api_key": None},
+        "youtube_trending_videos_US_",
+        "sample_video",
+    ),
+    (
+        "fetch_youtube_trending_topics",
+        "format_and_save_youtube_topics",
+        {"region_code": "CA", "max_results": 15},
+        {"region_code": "CA", "max_results": 15, "api_key": None},
+        "youtube_trending_topics_CA_",
+        None,
+    ),
+    (
+        "fetch_youtube_trending_music",
+        "format_and_save_youtube_music",
+        {"region_code": "GB", "max_results": 20},
+        {"region_code": "GB", "max_results": 20, "api_key": None},
+        "youtube_trending_music_GB_",
+        "sample_video",
+    ),
+    (
+        "get_tiktok_trending",
+        "format_and_save_tiktok_trends",
+        {},
+        {"api_key": None},
+        "tiktok_trending_",
+        "sample_tiktok_data",
+    ),
+], ids=["videos", "topics", "music", "tiktok"])
+def test_format_and_save(fake_formatter, mocker, request,
+                         fetch_target, method_name, kwargs, fetch_kwargs, prefix, payload):
+    """Test fetch, format, and save for each platform."""
+    if payload == "sample_video":
+        return_value = [request.getfixturevalue(payload)]
+    elif payload:
+        return_value = request.getfixturevalue(payload)
+    else:
+        return_value = ["Topic 1", "Topic 2"]
+    mock_fetch = mocker.patch(f'trend_result_formatter.{fetch_target}',
+                              return_value=return_value)
+    
+    filepath = getattr(fake_formatter, method_name)(**kwargs)
+    
+    mock_fetch.assert_called_once_with(**fetch_kwargs)
+    _assert_saved(filepath, prefix)
+
+
+def test_format_and_save_all(fake_formatter, mocker, sample_video, sample_tiktok_data):
+    """Test that every trend type is fetched and saved in one call."""
+    mocker.patch('trend_result_formatter.fetch_youtube_trending_videos', return_value=[sample_video])
+    mocker.patch('trend_result_formatter.fetch_youtube_trending_topics', return_value=["Topic 1"])
+    mocker.patch('trend_result_formatter.fetch_youtube_trending_music', return_value=[sample_video])
+    mocker.patch('trend_result_formatter.get_tiktok_trending', return_value=sample_tiktok_data)
+    
+    saved = fake_formatter.format_and_save_all(region_code="GB", max_results=5)
+    
+    assert set(saved) == {"videos", "topics", "music", "tiktok"}
+    stamps = set()
+    for path in saved.values():
+        with open(path, 'rb') as f:
+            stamps.add(json.loads(f.read())["metadata"]["retrieved_at"])
+    assert len(stamps) == 1
+    _assert_saved(saved["videos"], "youtube_trending_videos_GB_")
+    _assert_saved(saved["topics"], "youtube_trending_topics_GB_")
+    _assert_saved(saved["music"], "youtube_trending_music_GB_")
+    _assert_saved(saved["tiktok"], "tiktok_trending_")
+
+
+@pytest.mark.parametrize("fetch_target,save_func,kwargs,prefix,return_value", [
+    ("fetch_youtube_trending_videos", save_youtube_trending_videos,
+     {"region_code": "US", "max_results": 5}, "youtube_trending_videos_US_",
+     [{"id": "test", "title": "Test"}]),
+    ("fetch_youtube_trending_topics", save_youtube_trending_topics,
+     {"region_code": "CA"}, "youtube_trending_topics_CA_",
+     ["Topic 1"]),
+    ("fetch_youtube_trending_music", save_youtube_trending_music,
+     {"region_code": "GB"}, "youtube_trending_music_GB_",
+     [{"id": "test", "title": "Test"}]),
+    ("get_tiktok_trending", save_tiktok_trending,
+     {}, "tiktok_trending_",
+     {"hashtags": [], "sounds": []}),
+], ids=["videos", "topics", "music", "tiktok"])
+def test_convenience_save(fs, mocker, fetch_target, save_func, kwargs, prefix, return_value):
+    """Test the module-level save_* convenience functions."""
+    mocker.patch(f'trend_result_formatter.{fetch_target}', return_value=return_value)
+    
+    filepath = save_func(output_dir="/out", **kwargs)
+    
+    _assert_saved(filepath, prefix)
+
+
+def test_retrieved_at_matches_utc_filename_stamp(formatter, mocker):
+    """The saved file's name and its retrieved_at use the same (UTC) clock."""
+    mocker.patch("trend_result_formatter.get_tiktok_trending",
+                 return_value={"hashtags": [], "sounds": []})
+
+    path = formatter.format_and_save_tiktok_trends()
+    with open(path, encoding="utf-8") as f:
+        retrieved = datetime.fromisoformat(json.load(f)["metadata"]["retrieved_at"])
+
+    assert retrieved.utcoffset() == timedelta(0)
+    file_time = datetime.strptime(Path(path).stem[-15:], "%Y%m%d_%H%M%S")
+    assert abs(retrieved.replace(tzinfo=None) - file_time) < timedelta(seconds=2)
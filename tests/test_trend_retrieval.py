@@ -1,435 +1,277 @@
-#!/usr/bin/env python3
 """
-Test script to verify all functions in trend_retrieval.py work correctly
+Tests for the functions in trend_retrieval.py
 """
 
+import asyncio
+import json
 import os
-import sys
-from typing import Dict, List, Any
-
-# Import all functions from trend_retrieval
-from trend_retrieval import (
-    fetch_youtube_trending_videos,
-    fetch_youtube_trending_topics,
-    fetch_youtube_trending_music,
-    get_tiktok_trending,
-    get_video_captions,
-    validate_region_code,
-    validate_video_id,
-    validate_api_key,
-    test_youtube_captions_api,
-    ValidationError
-)
-
-
-
-def test_validation_functions():
-    """Test all validation functions."""
-    print("\n=== Testing Validation Functions ===")
-    
-    # Test validate_region_code
-    try:
-        # Valid region codes
-        assert validate_region_code("US") == "US"
-        assert validate_region_code("us") == "US"
-        assert validate_region_code(" GB ") == "GB"
-        print("✅ validate_region_code: Valid codes work correctly")
-        
-        # Invalid region codes
-        try:
-            validate_region_code("INVALID")
-            print("❌ validate_region_code: Should have raised ValidationError for invalid code")
-            return False
-        except ValidationError:
-            print("✅ validate_region_code: Correctly raises ValidationError for invalid code")
-        
-        try:
-            validate_region_code("")
-            print("❌ validate_region_code: Should have raised ValidationError for empty code")
-            return False
-        except ValidationError:
-            print("✅ validate_region_code: Correctly raises ValidationError for empty code")
-            
-    except Exception as e:
-        print(f"❌ Error in validate_region_code tests: {e}")
-        return False
-    
-    # Test validate_video_id
-    try:
-        # Valid video IDs
-        assert validate_video_id("dQw4w9WgXcQ") == "dQw4w9WgXcQ"
-        assert validate_video_id("abc123def45") == "abc123def45"
-        print("✅ validate_video_id: Valid IDs work correctly")
-        
-        # Invalid video IDs
-        try:
-            validate_video_id("INVALID")
-            print("❌ validate_video_id: Should have raised ValidationError for invalid ID")
-            return False
-        except ValidationError:
-            print("✅ validate_video_id: Correctly raises ValidationError for invalid ID")
-        
-        try:
-            validate_video_id("")
-            print("❌ validate_video_id: Should have raised ValidationError for empty ID")
-            return False
-        except ValidationError:
-            print("✅ validate_video_id: Correctly raises ValidationError for empty ID")
-            
-    except Exception as e:
-        print(f"❌ Error in validate_video_id tests: {e}")
-        return False
-    
-    # Test validate_api_key
-    try:
-        # Valid API keys
-        assert validate_api_key("valid_api_key_123") == "valid_api_key_123"
-        assert validate_api_key("a" * 20) == "a" * 20
-        print("✅ validate_api_key: Valid keys work correctly")
-        
-        # Invalid API keys
-        try:
-            validate_api_key("")
-            print("❌ validate_api_key: Should have raised ValidationError for empty key")
-            return False
-        except ValidationError:
-            print("✅ validate_api_key: Correctly raises ValidationError for empty key")
-        
-        try:
-            validate_api_key("short")
-            print("❌ validate_api_key: Should have raised ValidationError for short key")
-            return False
-        except ValidationError:
-            print("✅ validate_api_key: Correctly raises ValidationError for short key")
-            
-    except Exception as e:
-        print(f"❌ Error in validate_api_key tests: {e}")
-        return False
-    
-    return True
-
-
-def test_environment_setup():
-    """Test if required environment variables are set."""
-    print("\n=== Testing Environment Setup ===")
-    
-    # Check if .env file exists
-    env_file_exists = os.path.exists(".env")
-    print(f"✅ .env file exists: {env_file_exists}")
-    
-    # Check for required API keys
-    youtube_key = os.getenv("YOUTUBE_API_KEY")
-    tiktok_key = os.getenv("TIKTOK_RAPIDAPI_KEY")
-    apify_key = os.getenv("APIFY_API_TOKEN")
-    
-    print(f"✅ YOUTUBE_API_KEY set: {bool(youtube_key)}")
-    print(f"✅ TIKTOK_RAPIDAPI_KEY set: {bool(tiktok_key)}")
-    print(f"✅ APIFY_API_TOKEN set: {bool(apify_key)}")
-    
-    if not youtube_key:
-        print("⚠️  Warning: YOUTUBE_API_KEY not set - YouTube functions will fail")
-    
-    return bool(youtube_key)
-
-
-def test_fetch_youtube_trending_videos():
-    """Test fetch_youtube_trending_videos function."""
-    print("\n=== Testing fetch_youtube_trending_videos ===")
-    
-    try:
-        # Test basic functionality
-        videos = fetch_youtube_trending_videos(
-            region_code="US",
-            max_results=3,
-            include_captions=False
-        )
-        
-        print(f"✅ Successfully fetched {len(videos)} trending videos")
-        
-        if videos:
-            video = videos[0]
-            required_fields = ["id", "title", "channelTitle", "tags", "categoryId", "description", "publishedAt", "viewCount", "likeCount", "commentCount"]
-            missing_fields = [field for field in required_fields if field not in video]
-            
-            if missing_fields:
-                print(f"❌ Missing fields in video data: {missing_fields}")
-            else:
-                print("✅ All required fields present in video data")
-            
-            print(f"Sample video: {video['title']} by {video['channelTitle']}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error in fetch_youtube_trending_videos: {e}")
-        return False
-
-
-def test_fetch_youtube_trending_videos_with_captions():
-    """Test fetch_youtube_trending_videos with captions."""
-    print("\n=== Testing fetch_youtube_trending_videos with captions ===")
-    
-    try:
-        # Test with captions (smaller number to avoid rate limits)
-        videos = fetch_youtube_trending_videos(
-            region_code="US",
-            max_results=10,
-            include_captions=True,
-            caption_language='en'
-        )
-        
-        print(f"✅ Successfully fetched {len(videos)} videos with caption support")
-        
-        caption_count = sum(1 for v in videos if v.get('captions'))
-        print(f"📝 Videos with captions: {caption_count}/{len(videos)}")
-        
-        if videos:
-            video = videos[0]
-            if video.get('captions'):
-                captions = video['captions']
-                print(f"✅ Caption data structure: {list(captions.keys())}")
-                print(f"   Language: {captions.get('language')}")
-                print(f"   Auto-generated: {captions.get('is_auto')}")
-                print(f"   Format: {captions.get('format')}")
-                print(f"   Method: {captions.get('method')}")
-            else:
-                print("ℹ️  No captions available for first video")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error in fetch_youtube_trending_videos with captions: {e}")
-        return False
-
-
-def test_fetch_youtube_trending_topics():
-    """Test fetch_youtube_trending_topics function."""
-    print("\n=== Testing fetch_youtube_trending_topics ===")
-    
-    try:
-        topics = fetch_youtube_trending_topics(
-            region_code="US",
-            max_results=5
-        )
-        
-        print(f"✅ Successfully fetched {len(topics)} trending topics")
-        
-        if topics:
-            print("Sample topics:")
-            for i, topic in enumerate(topics[:5], 1):
-                print(f"  {i}. {topic}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error in fetch_youtube_trending_topics: {e}")
-        return False
-
-
-def test_fetch_youtube_trending_music():
-    """Test fetch_youtube_trending_music function."""
-    print("\n=== Testing fetch_youtube_trending_music ===")
-    
-    try:
-        music_videos = fetch_youtube_trending_music(
-            region_code="US",
-            max_results=3
-        )
-        
-        print(f"✅ Successfully fetched {len(music_videos)} music videos")
-        
-        if music_videos:
-            video = music_videos[0]
-            print(f"Sample music video: {video['title']} by {video['channelTitle']}")
-            
-            # Check if it's actually a music video (categoryId should be 10)
-            if video.get('categoryId') == '10':
-                print("✅ Correctly identified as music video (categoryId=10)")
-            else:
-                print(f"⚠️  Unexpected categoryId: {video.get('categoryId')}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error in fetch_youtube_trending_music: {e}")
-        return False
-
-
-def test_get_video_captions():
-    """Test get_video_captions function."""
-    print("\n=== Testing get_video_captions ===")
-    
-    try:
-        # Test with a well-known video that likely has captions
-        video_id = "dQw4w9WgXcQ"  # Rick Astley - Never Gonna Give You Up
-        
-        captions = get_video_captions(video_id, language='en')
-        
-        if captions:
-            print(f"✅ Successfully fetched captions for video {video_id}")
-            print(f"   Language: {captions['language']}")
-            print(f"   Auto-generated: {captions['is_auto']}")
-            print(f"   Format: {captions['format']}")
-            print(f"   Method: {captions.get('method', 'unknown')}")
-            print(f"   Content length: {len(captions['content'])} characters")
-            
-            # Show first few lines of content
-            lines = captions['content'].split('\n')[:5]
-            print("   Content preview:")
-            for line in lines:
-                if line.strip():
-                    print(f"     {line}")
-        else:
-            print(f"ℹ️  No captions found for video {video_id}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error in get_video_captions: {e}")
-        return False
-
-
-def test_get_tiktok_trending():
-    """Test get_tiktok_trending function."""
-    print("\n=== Testing get_tiktok_trending ===")
-    
-    try:
-        trending = get_tiktok_trending()
-        
-        hashtags = trending.get("hashtags", [])
-        sounds = trending.get("sounds", [])
-        
-        print(f"✅ Successfully fetched TikTok trending data")
-        print(f"   Hashtags: {len(hashtags)}")
-        print(f"   Sounds: {len(sounds)}")
-        
-        if hashtags:
-            top_hashtag = hashtags[0]
-            print(f"   Top hashtag: {top_hashtag.get('hashtag')} ({top_hashtag.get('count')} plays)")
-        
-        if sounds:
-            top_sound = sounds[0]
-            print(f"   Top sound: {top_sound.get('sound_name')} ({top_sound.get('play_count')} plays)")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error in get_tiktok_trending: {e}")
-        return False
-
-
-def test_youtube_captions_api_function():
-    """Test the YouTube captions API test function."""
-    print("\n=== Testing test_youtube_captions_api ===")
-    
-    try:
-        result = test_youtube_captions_api()
-        
-        if result.get("status") == "success":
-            print("✅ YouTube captions API test successful")
-            print(f"   Video ID: {result.get('video_id')}")
-            print(f"   Caption tracks found: {result.get('caption_tracks_found')}")
-        elif result.get("status") == "error":
-            print(f"⚠️  YouTube captions API test failed: {result.get('error_text', result.get('exception', 'Unknown error'))}")
-        else:
-            print(f"ℹ️  YouTube captions API test result: {result}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error in test_youtube_captions_api: {e}")
-        return False
-
-
-def test_error_handling():
-    """Test error handling for invalid inputs."""
-    print("\n=== Testing Error Handling ===")
-    
-    try:
-        # Test with invalid region code
-        try:
-            videos = fetch_youtube_trending_videos(
-                region_code="INVALID_REGION",
-                max_results=1
-            )
-            print("❌ Invalid region code should have caused an error")
-            return False
-        except Exception as e:
-            print("✅ Invalid region code handled correctly with error")
-        
-    except Exception as e:
-        print(f"❌ Unexpected error with invalid region code: {e}")
-        return False
-    
-    try:
-        # Test with invalid video ID
-        captions = get_video_captions("INVALID_VIDEO_ID", language='en')
-        if captions is None:
-            print("✅ Invalid video ID handled gracefully (returned None)")
-        else:
-            print("⚠️  Unexpected result for invalid video ID")
-            
-    except Exception as e:
-        print(f"❌ Invalid video ID caused error: {e}")
-        return False
-    
-    return True
-
-
-def run_all_tests():
-    """Run all tests and provide summary."""
-    print("🧪 Testing All Functions in trend_retrieval.py")
-    print("=" * 60)
-    
-    # Check environment first
-    youtube_available = test_environment_setup()
-    
-    test_results = []
-    
-    # Test validation functions (don't require API keys)
-    test_results.append(("validation_functions", test_validation_functions()))
-    
-    # Test YouTube functions (only if API key is available)
-    if youtube_available:
-        test_results.append(("fetch_youtube_trending_videos", test_fetch_youtube_trending_videos()))
-        test_results.append(("fetch_youtube_trending_videos_with_captions", test_fetch_youtube_trending_videos_with_captions()))
-        test_results.append(("fetch_youtube_trending_topics", test_fetch_youtube_trending_topics()))
-        test_results.append(("fetch_youtube_trending_music", test_fetch_youtube_trending_music()))
-        test_results.append(("get_video_captions", test_get_video_captions()))
-        test_results.append(("test_youtube_captions_api", test_youtube_captions_api_function()))
-    else:
-        print("\n⚠️  Skipping YouTube tests due to missing YOUTUBE_API_KEY")
-    
-    # Test TikTok function (doesn't require API key)
-    test_results.append(("get_tiktok_trending", test_get_tiktok_trending()))
-    
-    # Test error handling
-    test_results.append(("error_handling", test_error_handling()))
-    
-    # Summary
-    print("\n" + "=" * 60)
-    print("📊 TEST SUMMARY")
-    print("=" * 60)
-    
-    passed = 0
-    total = len(test_results)
-    
-    for test_name, result in test_results:
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{status} {test_name}")
-        if result:
-            passed += 1
-    
-    print(f"\nOverall: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("🎉 All tests passed! All functions are working correctly.")
-    else:
-        print("⚠️  Some tests failed. Check the output above for details.")
-    
-    return passed == total
-
-
-if __name__ == "__main__":
-    success = run_all_tests()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+import threading
+import time
+
+import pytest
+
+# Everything except the validation/error-handling checks talks to live YouTube/TikTok
+# endpoints; those tests only run with `pytest -m integration` and get a hard timeout
+# so a hung HTTPS call cannot stall the run.
+def integration(func):
+    return pytest.mark.integration(pytest.mark.timeout(30)(func))
+
+
+@pytest.fixture(scope="session")
+def tr():
+    """The trend_retrieval module, imported on first use rather than at collection."""
+    import trend_retrieval
+    return trend_retrieval
+
+
+@pytest.fixture(scope="session")
+def youtube_api_key(tr):
+    """YouTube API key from the environment; skips the test when it is not set."""
+    # Depends on `tr` so that importing trend_retrieval has loaded .env first
+    key = os.getenv("YOUTUBE_API_KEY")
+    if not key:
+        pytest.skip("YOUTUBE_API_KEY not set - YouTube functions cannot be exercised")
+    return key
+
+
+# --- Validation functions (no network) ---
+
+LONG_KEY = "a" * 20
+
+VALID_REGIONS = [("US", "US"), ("us", "US"), (" GB ", "GB")]
+INVALID_REGIONS = ["INVALID", ""]
+VALID_VIDEO_IDS = ["dQw4w9WgXcQ", "abc123def45"]
+INVALID_VIDEO_IDS = ["INVALID", ""]
+VALID_API_KEYS = ["valid_api_key_123", LONG_KEY]
+INVALID_API_KEYS = ["", "short"]
+
+
+@pytest.mark.parametrize("inp,expected", VALID_REGIONS)
+def test_validate_region_code_valid(tr, inp, expected):
+    assert tr.validate_region_code(inp) == expected
+
+
+@pytest.mark.parametrize("inp", INVALID_REGIONS)
+def test_validate_region_code_invalid(tr, inp):
+    with pytest.raises(tr.ValidationError):
+        tr.validate_region_code(inp)
+
+
+@pytest.mark.parametrize("video_id", VALID_VIDEO_IDS)
+def test_validate_video_id_valid(tr, video_id):
+    assert tr.validate_video_id(video_id) == video_id
+
+
+@pytest.mark.parametrize("video_id", INVALID_VIDEO_IDS)
+def test_validate_video_id_invalid(tr, video_id):
+    with pytest.raises(tr.ValidationError):
+        tr.validate_video_id(video_id)
+
+
+@pytest.mark.parametrize("key", VALID_API_KEYS)
+def test_validate_api_key_valid(tr, key):
+    assert tr.validate_api_key(key) == key
+
+
+@pytest.mark.parametrize("key", INVALID_API_KEYS)
+def test_validate_api_key_invalid(tr, key):
+    with pytest.raises(tr.ValidationError):
+        tr.validate_api_key(key)
+
+
+# --- Error handling (inputs are rejected before any request is made) ---
+
+def test_fetch_youtube_trending_videos_invalid_region(tr):
+    """An invalid region code is logged and yields no videos."""
+    videos = tr.fetch_youtube_trending_videos(
+        region_code="INVALID_REGION",
+        max_results=1,
+        api_key=LONG_KEY
+    )
+    assert videos == []
+
+
+def test_fetch_youtube_trending_many_invalid_region(tr):
+    """Each invalid region yields an empty list without failing the batch."""
+    results = asyncio.run(tr.fetch_youtube_trending_many(
+        ["INVALID_REGION"],
+        categories=[None, tr.MUSIC_CATEGORY_ID],
+        api_key=LONG_KEY
+    ))
+    assert results == {("INVALID_REGION", None): [], ("INVALID_REGION", "10"): []}
+
+
+def test_fetch_youtube_trending_videos_cached(tr, mocker):
+    """A repeated request within the TTL is answered without another HTTP call."""
+    tr.clear_response_cache()
+    session = mocker.patch.object(tr.config, "http_session").return_value
+    body = {"items": [{"id": "abc123def45", "snippet": {"title": "Cached"}, "statistics": {}}]}
+    session.get.return_value.content = json.dumps(body).encode()
+    session.get.return_value.json.return_value = body
+
+    first = tr.fetch_youtube_trending_videos(region_code="US", max_results=1, api_key=LONG_KEY)
+    first[0]["title"] = "mutated by caller"
+    second = tr.fetch_youtube_trending_videos(region_code="US", max_results=1, api_key=LONG_KEY)
+
+    assert session.get.call_count == 1
+    assert second[0]["title"] == "Cached"
+    tr.clear_response_cache()
+
+
+def test_fetch_youtube_trending_videos_not_modified(tr, mocker):
+    """Once the TTL has expired, a 304 for the stored ETag reuses the previous results."""
+    tr.clear_response_cache()
+    session = mocker.patch.object(tr.config, "http_session").return_value
+    ok = mocker.Mock(status_code=200, headers={"ETag": '"v1"'})
+    body = {"items": [{"id": "abc123def45", "snippet": {"title": "Fresh"}, "statistics": {}}]}
+    ok.content = json.dumps(body).encode()
+    ok.json.return_value = body
+    session.get.side_effect = [ok, mocker.Mock(status_code=304, headers={})]
+
+    first = tr.fetch_youtube_trending_videos(region_code="US", max_results=1, api_key=LONG_KEY)
+    tr._response_cache.clear()  # simulate TTL expiry; the ETag is kept
+    second = tr.fetch_youtube_trending_videos(region_code="US", max_results=1, api_key=LONG_KEY)
+
+    assert second == first
+    assert session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    tr.clear_response_cache()
+
+
+def test_fetch_youtube_trending_videos_coalesces_concurrent_misses(tr, mocker):
+    """Callers that miss the cache together wait for one upstream request."""
+    tr.clear_response_cache()
+    session = mocker.patch.object(tr.config, "http_session").return_value
+    body = {"items": [{"id": "abc123def45", "snippet": {"title": "Shared"}, "statistics": {}}]}
+
+    def slow_get(*args, **kwargs):
+        time.sleep(0.2)
+        return mocker.Mock(status_code=200, headers={}, content=json.dumps(body).encode(),
+                           **{"json.return_value": body})
+
+    session.get.side_effect = slow_get
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            tr.fetch_youtube_trending_videos(region_code="US", max_results=1, api_key=LONG_KEY)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert session.get.call_count == 1
+    assert [r[0]["title"] for r in results] == ["Shared"] * 5
+    assert len({id(r) for r in results}) == 5
+    tr.clear_response_cache()
+
+
+def test_get_tiktok_trending_inside_running_loop(tr, mocker):
+    """The blocking wrapper still works when the caller's thread runs an event loop."""
+    tr.clear_response_cache()
+    expected = {"hashtags": [{"hashtag": "#cats", "count": 3}], "sounds": []}
+
+    async def fake_fetch(api_key=None):
+        return expected
+
+    mocker.patch.object(tr, "get_tiktok_trending_async", side_effect=fake_fetch)
+
+    async def caller():
+        return tr.get_tiktok_trending()
+
+    assert asyncio.run(caller()) == expected
+    assert tr.get_tiktok_trending() == expected
+
+
+def test_get_video_captions_invalid_video_id(tr):
+    """An invalid video ID is handled gracefully."""
+    assert tr.get_video_captions("INVALID_VIDEO_ID", language='en') is None
+
+
+# --- Live API tests ---
+
+@integration
+def test_fetch_youtube_trending_videos(tr, youtube_api_key):
+    videos = tr.fetch_youtube_trending_videos(
+        region_code="US",
+        max_results=3,
+        include_captions=False
+    )
+
+    assert videos
+    required_fields = ["id", "title", "channelTitle", "tags", "categoryId", "description", "publishedAt", "viewCount", "likeCount", "commentCount"]
+    missing_fields = [field for field in required_fields if field not in videos[0]]
+    assert not missing_fields
+
+
+@integration
+def test_fetch_youtube_trending_videos_with_captions(tr, youtube_api_key):
+    # Small number of videos to avoid rate limits
+    videos = tr.fetch_youtube_trending_videos(
+        region_code="US",
+        max_results=10,
+        include_captions=True,
+        caption_language='en'
+    )
+
+    assert videos
+    for video in videos:
+        assert "captions" in video
+        if video["captions"]:
+            assert {"language", "is_auto", "format", "content"} <= set(video["captions"])
+
+
+@integration
+def test_fetch_youtube_trending_topics(tr, youtube_api_key):
+    topics = tr.fetch_youtube_trending_topics(
+        region_code="US",
+        max_results=5
+    )
+
+    assert topics
+    assert all(isinstance(topic, str) and topic for topic in topics)
+
+
+@integration
+def test_fetch_youtube_trending_music(tr, youtube_api_key):
+    music_videos = tr.fetch_youtube_trending_music(
+        region_code="US",
+        max_results=3
+    )
+
+    assert music_videos
+    # Music videos are category 10
+    assert music_videos[0].get('categoryId') == '10'
+
+
+@integration
+def test_get_video_captions(tr, youtube_api_key):
+    # A well-known video that likely has captions
+    video_id = "dQw4w9WgXcQ"  # Rick Astley - Never Gonna Give You Up
+
+    captions = tr.get_video_captions(video_id, language='en')
+
+    if captions is None:
+        pytest.skip(f"No captions found for video {video_id}")
+    assert captions['content']
+    assert captions['format']
+    assert 'language' in captions
+    assert 'is_auto' in captions
+
+
+@integration
+def test_get_tiktok_trending(tr):
+    trending = tr.get_tiktok_trending()
+
+    assert set(trending) == {"hashtags", "sounds"}
+    for hashtag in trending["hashtags"]:
+        assert isinstance(hashtag["count"], int)
+    for sound in trending["sounds"]:
+        assert isinstance(sound["play_count"], int)
+
+
+@integration
+def test_youtube_captions_api_function(tr, youtube_api_key):
+    result = tr.test_youtube_captions_api()
+
+    assert result.get("status") == "success", result
@@ -0,0 +1,140 @@
+"""
+Tests for the functions in youtube_channel.py, against a mocked API client
+"""
+
+import pytest
+
+import youtube_channel as yc
+
+
+@pytest.fixture(autouse=True)
+def fresh_channel_cache():
+    yc.invalidate_my_channel_cache()
+    yield
+    yc.invalidate_my_channel_cache()
+
+
+CHANNEL = {
+    "snippet": {"title": "My Channel"},
+    "statistics": {"viewCount": "10", "subscriberCount": "2", "videoCount": "1"},
+    "contentDetails": {"relatedPlaylists": {"uploads": "UU123"}},
+}
+
+
+def test_channel_getters_share_one_channels_list_call(mocker):
+    youtube = mocker.Mock()
+    channels_list = youtube.channels.return_value.list
+    channels_list.return_value.execute.return_value = {"items": [CHANNEL]}
+
+    assert yc.get_my_channel_statistics(youtube)["viewCount"] == 10
+    assert yc.get_my_channel_snippet(youtube) == {"title": "My Channel"}
+    assert yc.get_my_uploads_playlist_id(youtube) == "UU123"
+    assert channels_list.call_count == 1
+
+    channels_list.return_value.execute.return_value = {"items": [{**CHANNEL, "snippet": {"title": "Renamed"}}]}
+    yc.invalidate_my_channel_cache()
+
+    assert yc.get_my_channel_snippet(youtube) == {"title": "Renamed"}
+    assert channels_list.call_count == 2
+
+
+def test_channel_cache_is_per_client(mocker):
+    first, second = mocker.Mock(), mocker.Mock()
+    for youtube in (first, second):
+        youtube.channels.return_value.list.return_value.execute.return_value = {"items": [CHANNEL]}
+
+    yc.get_my_channel_snippet(first)
+    yc.get_my_channel_snippet(second)
+
+    assert first.channels.return_value.list.call_count == 1
+    assert second.channels.return_value.list.call_count == 1
+
+
+def _batching_client(mocker, fail_ids=()):
+    """Mock client whose batch request calls back per added request, like BatchHttpRequest."""
+    youtube = mocker.Mock()
+    youtube.videos.return_value.list.side_effect = lambda part, id: {"ids": id.split(",")}
+
+    def new_batch(callback):
+        added = []
+        batch = mocker.Mock()
+        batch.add.side_effect = lambda request, request_id: added.append((request_id, request))
+
+        def execute():
+            # Callbacks arrive out of order, as they can for a real batch
+            for request_id, request in reversed(added):
+                if set(request["ids"]) & set(fail_ids):
+                    callback(request_id, None, RuntimeError(f"chunk {request_id} failed"))
+                else:
+                    callback(request_id, {"items": [{"id": v} for v in request["ids"]]}, None)
+
+        batch.execute.side_effect = execute
+        return batch
+
+    youtube.new_batch_http_request.side_effect = new_batch
+    return youtube
+
+
+def test_get_video_statistics_batch_keeps_input_order(mocker):
+    youtube = _batching_client(mocker)
+    video_ids = [f"v{i}" for i in range(120)]
+
+    items = yc.get_video_statistics(youtube, video_ids)
+
+    assert [item["id"] for item in items] == video_ids
+    assert youtube.new_batch_http_request.call_count == 1
+    assert [len(c.kwargs["id"].split(",")) for c in youtube.videos.return_value.list.call_args_list] == [50, 50, 20]
+
+
+def test_get_video_statistics_batch_reraises_first_error(mocker):
+    # Callbacks run last chunk first, so the first error recorded is chunk 2's
+    youtube = _batching_client(mocker, fail_ids=("v10", "v110"))
+
+    with pytest.raises(RuntimeError, match="chunk 2 failed"):
+        yc.get_video_statistics(youtube, [f"v{i}" for i in range(120)])
+
+
+def test_get_video_statistics_single_chunk_skips_batch(mocker):
+    youtube = mocker.Mock()
+    youtube.videos.return_value.list.return_value.execute.return_value = {"items": [{"id": "a"}]}
+
+    assert yc.get_video_statistics(youtube, ["a"]) == [{"id": "a"}]
+    assert yc.get_video_statistics(youtube, []) == []
+    youtube.new_batch_http_request.assert_not_called()
+
+
+def _uploads_client(mocker, pages):
+    youtube = mocker.Mock()
+    youtube.channels.return_value.list.return_value.execute.return_value = {"items": [CHANNEL]}
+    youtube.playlistItems.return_value.list.return_value.execute.side_effect = pages
+    return youtube
+
+
+def test_get_my_recent_uploads_requests_only_missing_items(mocker):
+    pages = [
+        {"items": [{"n": i} for i in range(50)], "nextPageToken": "p2"},
+        {"items": [{"n": i} for i in range(50, 100)], "nextPageToken": "p3"},
+        {"items": [{"n": i} for i in range(100, 120)], "nextPageToken": "p4"},
+    ]
+    youtube = _uploads_client(mocker, pages)
+
+    uploads = yc.get_my_recent_uploads(youtube, max_results=120)
+
+    calls = youtube.playlistItems.return_value.list.call_args_list
+    assert [c.kwargs["maxResults"] for c in calls] == [50, 50, 20]
+    assert [c.kwargs["pageToken"] for c in calls] == [None, "p2", "p3"]
+    assert all(c.kwargs["playlistId"] == "UU123" for c in calls)
+    assert [u["n"] for u in uploads] == list(range(120))
+
+
+def test_get_my_recent_uploads_stops_without_next_page_token(mocker):
+    pages = [
+        {"items": [{"n": i} for i in range(50)], "nextPageToken": "p2"},
+        {"items": [{"n": i} for i in range(50, 60)]},
+    ]
+    youtube = _uploads_client(mocker, pages)
+
+    uploads = yc.get_my_recent_uploads(youtube, max_results=120)
+
+    assert youtube.playlistItems.return_value.list.call_count == 2
+    assert len(uploads) == 60
@@ -1,22 +1,40 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+import copy
+import json
+import logging
 import re
+import time
 
-import openai
-
-# Ensure environment is loaded
-import config  # noqa: F401  (side-effect: loads .env)
+import config
 
 from trend_retrieval import (
     get_tiktok_trending,
     fetch_youtube_trending_topics,
 )
-from video_tools import get_stock_video, format_vertical
-from youtube_upload import youtube_authenticate, upload_video
 
+# video_tools and youtube_upload are imported where they are used, and the OpenAI
+# client is created on first use, so detect_trend alone does not pay for their
+# (heavy) import chains
+
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_MAX_TOKENS = 120
+# Preview runs (upload=False) draft scripts for this many top trends in one request
+PREVIEW_SCRIPT_COUNT = 5
 
-openai.api_key = config.OPENAI_API_KEY
+_INDEX_RE = re.compile(r"^INDEX=(\d+):", re.MULTILINE)
+_WS_RE = re.compile(r"\s+")
+
+# Trending lists change over minutes to hours, so detect_trend results are reused for a
+# while: first from memory, then from a JSON file per (source, region) on disk.
+TREND_CACHE_DIR = Path("trend_results") / "_cache"
+TREND_CACHE_TTL_MINUTES = {"tiktok": 15, "youtube": 30}
+_trend_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
 
 
 def _clean_hashtag_tag(tag: str) -> str:
@@ -25,29 +43,98 @@ def _clean_hashtag_tag(tag: str) -> str:
         return ""
     if not cleaned.startswith("#"):
         cleaned = f"#{cleaned}"
-    return re.sub(r"\s+", "", cleaned)
+    # Every whitespace character other than " " is non-printable, so this skips the
+    # regex for the usual single-word tag
+    if " " not in cleaned and cleaned.isprintable():
+        return cleaned
+    return _WS_RE.sub("", cleaned)
 
 
 def detect_trend(
     source: str = "tiktok",
     region: str = "US",
     max_youtube_results: int = 25,
+    force_refresh: bool = False,
 ) -> Tuple[str, Dict[str, Any]]:
     """Detect a trending topic from TikTok or YouTube.
 
+    Results are cached in memory and under TREND_CACHE_DIR for TREND_CACHE_TTL_MINUTES
+    (per source); pass force_refresh=True to bypass the cache and refetch.
+
     Returns (topic_text, metadata).
     """
-    source_lower = (source or "").lower()
+    source_key = "tiktok" if (source or "").lower() == "tiktok" else "youtube"
+    key = (source_key, region)
+    params = {"max_youtube_results": max_youtube_results}
+
+    if not force_refresh:
+        entry = _trend_cache.get(key) or _load_trend_cache(key)
+        if entry is not None and entry.get("params") == params and _is_fresh(entry):
+            _trend_cache[key] = entry
+            topic_text, metadata = entry["data"]
+            return topic_text, copy.deepcopy(metadata)
+
+    topic_text, metadata = _fetch_trend(source_key, region, max_youtube_results)
+    if not _has_upstream_topic(metadata):
+        # Placeholder topic ("viral"/"trending"): don't pin it for the TTL, retry next call
+        return topic_text, metadata
+    entry = {
+        "fetched_at": time.time(),
+        "ttl_minutes": TREND_CACHE_TTL_MINUTES[source_key],
+        "params": params,
+        "data": [topic_text, copy.deepcopy(metadata)],
+    }
+    _trend_cache[key] = entry
+    _save_trend_cache(key, entry)
+    return topic_text, metadata
+
+
+def _has_upstream_topic(metadata: Dict[str, Any]) -> bool:
+    if metadata.get("source") == "tiktok":
+        return bool((metadata.get("top_hashtag") or {}).get("hashtag"))
+    return bool(metadata.get("topics"))
+
+
+def _is_fresh(entry: Dict[str, Any]) -> bool:
+    return time.time() - entry.get("fetched_at", 0) < entry.get("ttl_minutes", 0) * 60
+
 
-    if source_lower == "tiktok":
+def _trend_cache_path(key: Tuple[str, str]) -> Path:
+    return TREND_CACHE_DIR / f"{key[0]}_{key[1]}.json"
+
+
+def _load_trend_cache(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    path = _trend_cache_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable trend cache {path}: {e}")
+        return None
+
+
+def _save_trend_cache(key: Tuple[str, str], entry: Dict[str, Any]) -> None:
+    path = _trend_cache_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, default=str)
+    except OSError as e:
+        logger.warning(f"Could not write trend cache {path}: {e}")
+
+
+def _fetch_trend(
+    source_key: str, region: str, max_youtube_results: int
+) -> Tuple[str, Dict[str, Any]]:
+    if source_key == "tiktok":
         trending = get_tiktok_trending()
         hashtags = trending.get("hashtags", [])
         sounds = trending.get("sounds", [])
 
         # Pick highest-count hashtag if available
-        top_hashtag = None
-        if hashtags:
-            top_hashtag = max(hashtags, key=lambda h: int(h.get("count", 0) or 0))
+        top_hashtag = _top_by(hashtags, "count")
 
         topic_text = (top_hashtag or {}).get("hashtag") or "viral"
         topic_text = topic_text.strip()
@@ -55,7 +142,7 @@ def detect_trend(
         metadata = {
             "source": "tiktok",
             "top_hashtag": top_hashtag,
-            "top_sound": (max(sounds, key=lambda s: int(s.get("play_count", 0) or 0)) if sounds else None),
+            "top_sound": _top_by(sounds, "play_count"),
             "all_hashtags": hashtags,
             "all_sounds": sounds,
         }
@@ -67,16 +154,28 @@ def detect_trend(
     return topic_text, {"source": "youtube", "topics": yt_topics}
 
 
-def generate_script_for_trend(topic: str, hints: Optional[Dict[str, Any]] = None) -> str:
-    """Use OpenAI to generate a short script tailored to the trend."""
-    hints_text = ""
-    if hints:
-        if hints.get("source") == "tiktok":
-            ht = hints.get("top_hashtag", {})
-            hs = hints.get("top_sound", {})
-            ht_text = _clean_hashtag_tag((ht or {}).get("hashtag", ""))
-            sound_text = (hs or {}).get("sound_name")
-            hints_text = f"Hashtag: {ht_text or 'n/a'}; Sound: {sound_text or 'n/a'}."
+def _top_by(items: List[Dict[str, Any]], field: str) -> Optional[Dict[str, Any]]:
+    # First item with the largest count; get_tiktok_trending already returns ints
+    best, best_count = None, -1
+    for item in items:
+        count = item.get(field) or 0
+        if count > best_count:
+            best, best_count = item, count
+    return best
+
+
+def _hints_text(hints: Optional[Dict[str, Any]]) -> str:
+    if hints and hints.get("source") == "tiktok":
+        ht = hints.get("top_hashtag", {})
+        hs = hints.get("top_sound", {})
+        ht_text = _clean_hashtag_tag((ht or {}).get("hashtag", ""))
+        sound_text = (hs or {}).get("sound_name")
+        return f"Hashtag: {ht_text or 'n/a'}; Sound: {sound_text or 'n/a'}."
+    return ""
+
+
+def _script_prompt(topic: str, hints: Optional[Dict[str, Any]] = None) -> str:
+    hints_text = _hints_text(hints)
 
     prompt = (
         "Write a tight ~12-second YouTube Shorts script with a strong hook, 2-3 punchy lines, "
@@ -85,12 +184,87 @@ def generate_script_for_trend(topic: str, hints: Optional[Dict[str, Any]] = None
     )
     if hints_text:
         prompt += f" Context hints: {hints_text}"
+    return prompt
+
+
+def stream_script_for_trend(topic: str, hints: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """Yield the trend script piece by piece as the model generates it.
+
+    Lets downstream consumers (TTS, logging) start before the full script is done.
+    """
+    resp = config.openai_client().chat.completions.create(
+        model=config.trend_script_model(),
+        messages=[{"role": "user", "content": _script_prompt(topic, hints)}],
+        # A ~12s script is well under 120 tokens; the cap bounds worst-case latency
+        max_tokens=SCRIPT_MAX_TOKENS,
+        temperature=0.8,
+        stop=["\n\n\n"],
+        stream=True,
+    )
+    for chunk in resp:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
+
+def generate_script_for_trend(topic: str, hints: Optional[Dict[str, Any]] = None) -> str:
+    """Use OpenAI to generate a short script tailored to the trend."""
+    return "".join(stream_script_for_trend(topic, hints)).strip()
+
+
+def generate_scripts_for_trends(
+    topics: List[str], hints: Optional[Dict[str, Any]] = None
+) -> List[str]:
+    """Generate one script per topic in a single completion request.
 
-    resp = openai.ChatCompletion.create(
-        model="gpt-4o",
+    Returns scripts aligned with `topics`; a topic the model skipped gets "".
+    """
+    if not topics:
+        return []
+
+    numbered = "\n".join(f"{i}. {t}" for i, t in enumerate(topics, 1))
+    prompt = (
+        f"Write {len(topics)} separate tight ~12-second YouTube Shorts scripts, one for each "
+        "trend below. Each needs a strong hook, 2-3 punchy lines, and a clear call to action; "
+        "adapt tone/style to its trend. Start each script on a new line with 'INDEX=<n>:' "
+        "where <n> is the trend number, and write nothing else.\n" + numbered
+    )
+    hints_text = _hints_text(hints)
+    if hints_text:
+        prompt += f"\nContext hints for trend 1: {hints_text}"
+
+    resp = config.openai_client().chat.completions.create(
+        model=config.trend_script_model(),
         messages=[{"role": "user", "content": prompt}],
+        max_tokens=SCRIPT_MAX_TOKENS * len(topics),
+        temperature=0.8,
     )
-    return resp.choices[0].message["content"].strip()
+    return _split_indexed_scripts(resp.choices[0].message.content, len(topics))
+
+
+def _split_indexed_scripts(text: str, count: int) -> List[str]:
+    scripts = [""] * count
+    # re.split with a capture group yields [preamble, n1, body1, n2, body2, ...]
+    parts = _INDEX_RE.split(text or "")
+    for index, body in zip(parts[1::2], parts[2::2]):
+        i = int(index) - 1
+        if 0 <= i < count and not scripts[i]:
+            scripts[i] = body.strip()
+    return scripts
+
+
+def _preview_topics(topic: str, metadata: Dict[str, Any], limit: int = PREVIEW_SCRIPT_COUNT) -> List[str]:
+    if metadata.get("source") == "tiktok":
+        candidates = [h.get("hashtag") for h in (metadata.get("all_hashtags") or [])]
+    else:
+        candidates = list(metadata.get("topics") or [])
+    topics = [topic]
+    for candidate in candidates:
+        if len(topics) >= limit:
+            break
+        if candidate and candidate.strip() and candidate.strip() not in topics:
+            topics.append(candidate.strip())
+    return topics
 
 
 def build_title_and_tags(topic: str, metadata: Dict[str, Any]) -> Tuple[str, List[str]]:
@@ -111,6 +285,21 @@ def build_title_and_tags(topic: str, metadata: Dict[str, Any]) -> Tuple[str, Lis
     return title, tags
 
 
+def _draft_scripts(
+    topic: str, metadata: Dict[str, Any], upload: bool
+) -> Tuple[str, Dict[str, str]]:
+    """Return the script for `topic` plus, in preview mode, scripts for other top trends."""
+    if upload:
+        return generate_script_for_trend(topic, hints=metadata), {}
+
+    # Preview mode: draft scripts for the top trends with a single request
+    topics = _preview_topics(topic, metadata)
+    scripts = generate_scripts_for_trends(topics, hints=metadata)
+    script_text = scripts[0] or generate_script_for_trend(topic, hints=metadata)
+    alternates = {t: text for t, text in zip(topics[1:], scripts[1:]) if text}
+    return script_text, alternates
+
+
 def run_trend_chaser(
     source: str = "tiktok",
     region: str = "US",
@@ -123,10 +312,16 @@ def run_trend_chaser(
     """
     topic, metadata = detect_trend(source=source, region=region, max_youtube_results=max_youtube_results)
 
-    script_text = generate_script_for_trend(topic, hints=metadata)
+    from video_tools import get_stock_video, format_vertical
+
+    # Script generation (OpenAI) and the stock clip search are independent network
+    # calls, so run them side by side; formatting needs the clip, upload needs both
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        script_future = executor.submit(_draft_scripts, topic, metadata, upload)
+        stock_future = executor.submit(get_stock_video, topic)
+        script_text, alternates = script_future.result()
+        stock_path = stock_future.result()
 
-    # Get stock clip and format vertical
-    stock_path = get_stock_video(topic)
     vertical_path = format_vertical(stock_path)
 
     result: Dict[str, Any] = {
@@ -135,8 +330,12 @@ def run_trend_chaser(
         "script": script_text,
         "vertical_path": vertical_path,
     }
+    if alternates:
+        result["alternate_scripts"] = alternates
 
     if upload:
+        from youtube_upload import youtube_authenticate, upload_video
+
         youtube = youtube_authenticate()
         title, tags = build_title_and_tags(topic, metadata)
         upload_resp = upload_video(
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import gzip
 import json
 import os
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Optional, Union
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson is not installed
+    orjson = None
+
 # Import functions from trend_retrieval
 from trend_retrieval import (
     fetch_youtube_trending_videos,
@@ -14,6 +23,42 @@ from trend_retrieval import (
     get_tiktok_trending
 )
 
+# (output name, YouTube API field) for the per-video "statistics" block
+_STAT_FIELDS = (("views", "viewCount"), ("likes", "likeCount"), ("comments", "commentCount"))
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO 8601 string, for retrieved_at (same clock as filenames)."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _now_stamp() -> str:
+    """Current UTC time as YYYYmmdd_HHMMSS, for output filenames."""
+    return _stamp_for_second(int(time.time()))
+
+
+@lru_cache(maxsize=1)
+def _stamp_for_second(second: int) -> str:
+    # Files written within the same second share the formatted string
+    return time.strftime("%Y%m%d_%H%M%S", time.gmtime(second))
+
+
+def _word_count(text: str) -> int:
+    """Count whitespace-separated words, like len(text.split()) without the list."""
+    text = text.strip()
+    if not text:
+        return 0
+    # Single spaces are the only whitespace in most titles; anything else (runs of
+    # spaces, tabs, non-printable separators) takes the exact split() path
+    if "  " in text or not text.isprintable():
+        return len(text.split())
+    return text.count(" ") + 1
+
+
+def _safe_int(value: Any) -> int:
+    """Parse a YouTube count (a numeric string, or missing/empty) as an int."""
+    return int(value) if value else 0
+
 
 class TrendResultFormatter:
     """Formats and saves trend retrieval results in JSON format."""
@@ -29,13 +74,15 @@ class TrendResultFormatter:
     
     def format_youtube_videos(self, videos: List[Dict[str, Any]], 
                              region_code: str = "US",
-                             include_metadata: bool = True) -> Dict[str, Any]:
+                             include_metadata: bool = True,
+                             retrieved_at: Optional[str] = None) -> Dict[str, Any]:
         """Format YouTube trending videos results.
         
         Args:
             videos: List of video data from fetch_youtube_trending_videos
             region_code: Region code used for the search
             include_metadata: Whether to include metadata about the search
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
             
         Returns:
             Formatted dictionary ready for JSON serialization
@@ -43,36 +90,7 @@ class TrendResultFormatter:
         formatted_videos = []
         
         for video in videos:
-            formatted_video = {
-                "video_id": video.get("id"),
-                "title": video.get("title"),
-                "channel": video.get("channelTitle"),
-                "published_date": video.get("publishedAt"),
-                "statistics": {
-                    "views": int(video.get("viewCount", 0)) if video.get("viewCount") else 0,
-                    "likes": int(video.get("likeCount", 0)) if video.get("likeCount") else 0,
-                    "comments": int(video.get("commentCount", 0)) if video.get("commentCount") else 0
-                },
-                "category_id": video.get("categoryId"),
-                "tags": video.get("tags", []),
-                "description": video.get("description", "")[:2000] + "..." if video.get("description") and len(video.get("description", "")) > 2000 else video.get("description", "")
-            }
-            
-            # Add captions if available
-            if "captions" in video and video["captions"]:
-                captions = video["captions"]
-                formatted_video["captions"] = {
-                    "available": True,
-                    "language": captions.get("language"),
-                    "is_auto_generated": captions.get("is_auto", False),
-                    "format": captions.get("format"),
-                    "method": captions.get("method"),
-                    "content_length": len(captions.get("content", ""))
-                }
-            else:
-                formatted_video["captions"] = {"available": False}
-            
-            formatted_videos.append(formatted_video)
+            formatted_videos.append(self._format_video_common(video))
         
         result = {
             "videos": formatted_videos,
@@ -83,7 +101,7 @@ class TrendResultFormatter:
             result["metadata"] = {
                 "source": "YouTube Trending API",
                 "region_code": region_code,
-                "retrieved_at": datetime.now().isoformat(),
+                "retrieved_at": retrieved_at or _now_iso(),
                 "data_type": "trending_videos"
             }
         
@@ -91,13 +109,15 @@ class TrendResultFormatter:
     
     def format_youtube_topics(self, topics: List[str], 
                              region_code: str = "US",
-                             include_metadata: bool = True) -> Dict[str, Any]:
+                             include_metadata: bool = True,
+                             retrieved_at: Optional[str] = None) -> Dict[str, Any]:
         """Format YouTube trending topics results.
         
         Args:
             topics: List of topic titles from fetch_youtube_trending_topics
             region_code: Region code used for the search
             include_metadata: Whether to include metadata about the search
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
             
         Returns:
             Formatted dictionary ready for JSON serialization
@@ -108,7 +128,7 @@ class TrendResultFormatter:
             formatted_topics.append({
                 "rank": i,
                 "title": topic,
-                "word_count": len(topic.split())
+                "word_count": _word_count(topic)
             })
         
         result = {
@@ -120,7 +140,7 @@ class TrendResultFormatter:
             result["metadata"] = {
                 "source": "YouTube Trending API",
                 "region_code": region_code,
-                "retrieved_at": datetime.now().isoformat(),
+                "retrieved_at": retrieved_at or _now_iso(),
                 "data_type": "trending_topics"
             }
         
@@ -128,13 +148,15 @@ class TrendResultFormatter:
     
     def format_youtube_music(self, music_videos: List[Dict[str, Any]], 
                             region_code: str = "US",
-                            include_metadata: bool = True) -> Dict[str, Any]:
+                            include_metadata: bool = True,
+                            retrieved_at: Optional[str] = None) -> Dict[str, Any]:
         """Format YouTube trending music results.
         
         Args:
             music_videos: List of music video data from fetch_youtube_trending_music
             region_code: Region code used for the search
             include_metadata: Whether to include metadata about the search
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
             
         Returns:
             Formatted dictionary ready for JSON serialization
@@ -142,34 +164,8 @@ class TrendResultFormatter:
         formatted_music = []
         
         for video in music_videos:
-            formatted_video = {
-                "video_id": video.get("id"),
-                "title": video.get("title"),
-                "channel": video.get("channelTitle"),
-                "published_date": video.get("publishedAt"),
-                "statistics": {
-                    "views": int(video.get("viewCount", 0)) if video.get("viewCount") else 0,
-                    "likes": int(video.get("likeCount", 0)) if video.get("likeCount") else 0,
-                    "comments": int(video.get("commentCount", 0)) if video.get("commentCount") else 0
-                },
-                "tags": video.get("tags", []),
-                "description": video.get("description", "")[:2000] + "..." if video.get("description") and len(video.get("description", "")) > 2000 else video.get("description", "")
-            }
-            
-            # Add captions if available
-            if "captions" in video and video["captions"]:
-                captions = video["captions"]
-                formatted_video["captions"] = {
-                    "available": True,
-                    "language": captions.get("language"),
-                    "is_auto_generated": captions.get("is_auto", False),
-                    "format": captions.get("format"),
-                    "method": captions.get("method"),
-                    "content_length": len(captions.get("content", ""))
-                }
-            else:
-                formatted_video["captions"] = {"available": False}
-            
+            formatted_video = self._format_video_common(video)
+            del formatted_video["category_id"]
             formatted_music.append(formatted_video)
         
         result = {
@@ -181,7 +177,7 @@ class TrendResultFormatter:
             result["metadata"] = {
                 "source": "YouTube Trending API",
                 "region_code": region_code,
-                "retrieved_at": datetime.now().isoformat(),
+                "retrieved_at": retrieved_at or _now_iso(),
                 "data_type": "trending_music",
                 "category": "Music (ID: 10)"
             }
@@ -189,12 +185,14 @@ class TrendResultFormatter:
         return result
     
     def format_tiktok_trends(self, tiktok_data: Dict[str, List[Dict[str, Any]]], 
-                             include_metadata: bool = True) -> Dict[str, Any]:
+                             include_metadata: bool = True,
+                             retrieved_at: Optional[str] = None) -> Dict[str, Any]:
         """Format TikTok trending data results.
         
         Args:
             tiktok_data: Dictionary with hashtags and sounds from get_tiktok_trending
             include_metadata: Whether to include metadata about the search
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
             
         Returns:
             Formatted dictionary ready for JSON serialization
@@ -231,12 +229,41 @@ class TrendResultFormatter:
         if include_metadata:
             result["metadata"] = {
                 "source": "TikTok Trending API (Apify)",
-                "retrieved_at": datetime.now().isoformat(),
+                "retrieved_at": retrieved_at or _now_iso(),
                 "data_type": "trending_hashtags_and_sounds"
             }
         
         return result
     
+    def _format_video_common(self, video: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the per-video dict shared by the trending videos and music formats."""
+        get = video.get
+        desc = get("description") or ""
+        formatted_video = {
+            "video_id": get("id"),
+            "title": get("title"),
+            "channel": get("channelTitle"),
+            "published_date": get("publishedAt"),
+            "statistics": {name: _safe_int(get(key)) for name, key in _STAT_FIELDS},
+            "category_id": get("categoryId"),
+            "tags": get("tags", []),
+            "description": desc[:2000] + "..." if len(desc) > 2000 else desc
+        }
+
+        captions = get("captions")
+        if captions:
+            formatted_video["captions"] = {
+                "available": True,
+                "language": captions.get("language"),
+                "is_auto_generated": captions.get("is_auto", False),
+                "format": captions.get("format"),
+                "method": captions.get("method"),
+                "content_length": len(captions.get("content", ""))
+            }
+        else:
+            formatted_video["captions"] = {"available": False}
+        return formatted_video
+
     def _format_large_number(self, num: int) -> str:
         """Format large numbers with K, M, B suffixes."""
         if num >= 1_000_000_000:
@@ -249,13 +276,15 @@ class TrendResultFormatter:
             return str(num)
     
     def save_to_json(self, data: Dict[str, Any], filename: str, 
-                     pretty_print: bool = True) -> str:
+                     pretty_print: bool = False,
+                     compress: bool = False) -> str:
         """Save formatted data to a JSON file.
         
         Args:
             data: Formatted data dictionary
             filename: Name of the file (without extension)
             pretty_print: Whether to format JSON with indentation
+            compress: Whether to gzip the output (saved with a .json.gz extension)
             
         Returns:
             Path to the saved file
@@ -263,27 +292,89 @@ class TrendResultFormatter:
         # Ensure filename has .json extension
         if not filename.endswith('.json'):
             filename += '.json'
+        if compress:
+            filename += '.gz'
         
         filepath = self.output_dir / filename
         
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(exist_ok=True)
         
-        # Save to JSON file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            if pretty_print:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-            else:
-                json.dump(data, f, ensure_ascii=False, default=str)
+        payload = self._dump_json(data, pretty_print)
+        if compress:
+            # Level 3 gets most of the size reduction at a fraction of the CPU of level 9
+            with gzip.open(filepath, 'wb', compresslevel=3) as f:
+                f.write(payload)
+        else:
+            with open(filepath, 'wb') as f:
+                f.write(payload)
+        
+        return str(filepath)
+    
+    def save_stream(self, metadata: Dict[str, Any], items: Iterable[Dict[str, Any]],
+                    filename: str, items_key: str = "videos") -> str:
+        """Save items to a JSON file one record at a time.
+        
+        Each record is serialized and written as it arrives, so the whole payload is
+        never held in memory as a single JSON string. The file has the same shape as
+        the save_to_json output: {"metadata": ..., "<items_key>": [...], "total_count": n}.
+        
+        Args:
+            metadata: Metadata dictionary written ahead of the items
+            items: Iterable of formatted items
+            filename: Name of the file (without extension)
+            items_key: Key under which the items array is written
+            
+        Returns:
+            Path to the saved file
+        """
+        if not filename.endswith('.json'):
+            filename += '.json'
+        
+        filepath = self.output_dir / filename
+        self.output_dir.mkdir(exist_ok=True)
+        
+        count = 0
+        with open(filepath, 'wb', buffering=1 << 20) as f:
+            f.write(b'{"metadata":' + self._dump_json(metadata, False)
+                    + b',' + self._dump_json(items_key, False) + b':[')
+            for item in items:
+                if count:
+                    f.write(b',')
+                f.write(self._dump_json(item, False))
+                count += 1
+            f.write(b'],"total_count":' + str(count).encode('ascii') + b'}')
         
         return str(filepath)
     
+    def _dump_json(self, data: Dict[str, Any], pretty_print: bool) -> bytes:
+        """Serialize data to UTF-8 JSON bytes, using orjson when it is installed."""
+        if orjson is not None:
+            # Passing datetimes through to default=str keeps output identical to json.dump
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if pretty_print:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(data, default=str, option=option)
+            except TypeError:
+                # e.g. integers beyond 64 bits; let the stdlib encoder handle it
+                pass
+        
+        if pretty_print:
+            text = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+        else:
+            text = json.dumps(data, ensure_ascii=False, default=str, separators=(",", ":"))
+        return text.encode('utf-8')
+    
     def format_and_save_youtube_videos(self, region_code: str = "US", 
                                       max_results: int = 25,
                                       include_captions: bool = False,
                                       caption_language: str = 'en',
                                       filename: Optional[str] = None,
-                                      api_key: Optional[str] = None) -> str:
+                                      api_key: Optional[str] = None,
+                                      pretty_print: bool = False,
+                                      compress: bool = False,
+                                      retrieved_at: Optional[str] = None) -> str:
         """Fetch, format, and save YouTube trending videos.
         
         Args:
@@ -293,6 +384,51 @@ class TrendResultFormatter:
             caption_language: Language for captions
             filename: Custom filename (optional)
             api_key: YouTube API key (optional)
+            pretty_print: Whether to format JSON with indentation
+            compress: Whether to gzip the saved file
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
+            
+        Returns:
+            Path to the saved file
+        """
+        videos = fetch_youtube_trending_videos(
+            region_code=region_code,
+            max_results=max_results,
+            include_captions=include_captions,
+            caption_language=caption_language,
+            api_key=api_key
+        )
+        
+        formatted_data = self.format_youtube_videos(videos, region_code,
+                                                    retrieved_at=retrieved_at)
+        
+        if not filename:
+            timestamp = _now_stamp()
+            filename = f"youtube_trending_videos_{region_code}_{timestamp}.json"
+        
+        return self.save_to_json(formatted_data, filename, pretty_print, compress)
+    
+    def format_and_save_youtube_videos_stream(self, region_code: str = "US",
+                                             max_results: int = 25,
+                                             include_captions: bool = False,
+                                             caption_language: str = 'en',
+                                             filename: Optional[str] = None,
+                                             api_key: Optional[str] = None,
+                                             retrieved_at: Optional[str] = None) -> str:
+        """Fetch YouTube trending videos and write them out one formatted video at a time.
+        
+        Produces the same document as format_and_save_youtube_videos (compact, key
+        order aside) without building the formatted list or a full JSON string; useful
+        when many videos with captions are fetched.
+        
+        Args:
+            region_code: Country code for trending videos
+            max_results: Maximum number of videos to fetch
+            include_captions: Whether to fetch captions
+            caption_language: Language for captions
+            filename: Custom filename (optional)
+            api_key: YouTube API key (optional)
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
             
         Returns:
             Path to the saved file
@@ -305,18 +441,26 @@ class TrendResultFormatter:
             api_key=api_key
         )
         
-        formatted_data = self.format_youtube_videos(videos, region_code)
+        metadata = {
+            "source": "YouTube Trending API",
+            "region_code": region_code,
+            "retrieved_at": retrieved_at or _now_iso(),
+            "data_type": "trending_videos"
+        }
         
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = _now_stamp()
             filename = f"youtube_trending_videos_{region_code}_{timestamp}.json"
         
-        return self.save_to_json(formatted_data, filename)
+        return self.save_stream(metadata, map(self._format_video_common, videos), filename)
     
     def format_and_save_youtube_topics(self, region_code: str = "US",
                                       max_results: int = 25,
                                       filename: Optional[str] = None,
-                                      api_key: Optional[str] = None) -> str:
+                                      api_key: Optional[str] = None,
+                                      pretty_print: bool = False,
+                                      compress: bool = False,
+                                      retrieved_at: Optional[str] = None) -> str:
         """Fetch, format, and save YouTube trending topics.
         
         Args:
@@ -324,6 +468,9 @@ class TrendResultFormatter:
             max_results: Maximum number of topics to fetch
             filename: Custom filename (optional)
             api_key: YouTube API key (optional)
+            pretty_print: Whether to format JSON with indentation
+            compress: Whether to gzip the saved file
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
             
         Returns:
             Path to the saved file
@@ -334,18 +481,22 @@ class TrendResultFormatter:
             api_key=api_key
         )
         
-        formatted_data = self.format_youtube_topics(topics, region_code)
+        formatted_data = self.format_youtube_topics(topics, region_code,
+                                                    retrieved_at=retrieved_at)
         
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = _now_stamp()
             filename = f"youtube_trending_topics_{region_code}_{timestamp}.json"
         
-        return self.save_to_json(formatted_data, filename)
+        return self.save_to_json(formatted_data, filename, pretty_print, compress)
     
     def format_and_save_youtube_music(self, region_code: str = "US",
                                      max_results: int = 25,
                                      filename: Optional[str] = None,
-                                     api_key: Optional[str] = None) -> str:
+                                     api_key: Optional[str] = None,
+                                     pretty_print: bool = False,
+                                     compress: bool = False,
+                                     retrieved_at: Optional[str] = None) -> str:
         """Fetch, format, and save YouTube trending music.
         
         Args:
@@ -353,6 +504,9 @@ class TrendResultFormatter:
             max_results: Maximum number of music videos to fetch
             filename: Custom filename (optional)
             api_key: YouTube API key (optional)
+            pretty_print: Whether to format JSON with indentation
+            compress: Whether to gzip the saved file
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
             
         Returns:
             Path to the saved file
@@ -363,34 +517,88 @@ class TrendResultFormatter:
             api_key=api_key
         )
         
-        formatted_data = self.format_youtube_music(music_videos, region_code)
+        formatted_data = self.format_youtube_music(music_videos, region_code,
+                                                   retrieved_at=retrieved_at)
         
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = _now_stamp()
             filename = f"youtube_trending_music_{region_code}_{timestamp}.json"
         
-        return self.save_to_json(formatted_data, filename)
+        return self.save_to_json(formatted_data, filename, pretty_print, compress)
     
     def format_and_save_tiktok_trends(self, filename: Optional[str] = None,
-                                     api_key: Optional[str] = None) -> str:
+                                     api_key: Optional[str] = None,
+                                     pretty_print: bool = False,
+                                     compress: bool = False,
+                                     retrieved_at: Optional[str] = None) -> str:
         """Fetch, format, and save TikTok trending data.
         
         Args:
             filename: Custom filename (optional)
             api_key: Apify API token (optional)
+            pretty_print: Whether to format JSON with indentation
+            compress: Whether to gzip the saved file
+            retrieved_at: ISO timestamp for the metadata (defaults to now)
             
         Returns:
             Path to the saved file
         """
         tiktok_data = get_tiktok_trending(api_key=api_key)
         
-        formatted_data = self.format_tiktok_trends(tiktok_data)
+        formatted_data = self.format_tiktok_trends(tiktok_data, retrieved_at=retrieved_at)
         
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = _now_stamp()
             filename = f"tiktok_trending_{timestamp}.json"
         
-        return self.save_to_json(formatted_data, filename)
+        return self.save_to_json(formatted_data, filename, pretty_print, compress)
+
+    
+    def format_and_save_all(self, region_code: str = "US",
+                            max_results: int = 25,
+                            include_captions: bool = False,
+                            api_key: Optional[str] = None,
+                            tiktok_api_key: Optional[str] = None,
+                            pretty_print: bool = False,
+                            compress: bool = False) -> Dict[str, str]:
+        """Fetch, format, and save every trend type concurrently.
+        
+        The four fetches are independent, blocking HTTP calls, so running them on a
+        thread pool makes the total time roughly that of the slowest one.
+        
+        Args:
+            region_code: Country code for the YouTube results
+            max_results: Maximum number of YouTube items per request
+            include_captions: Whether to fetch captions for trending videos
+            api_key: YouTube API key (optional)
+            tiktok_api_key: Apify API token (optional)
+            pretty_print: Whether to format JSON with indentation
+            compress: Whether to gzip the saved files
+            
+        Returns:
+            Dict mapping "videos", "topics", "music" and "tiktok" to saved file paths
+        """
+        jobs = {
+            "videos": (self.format_and_save_youtube_videos,
+                       {"region_code": region_code, "max_results": max_results,
+                        "include_captions": include_captions, "api_key": api_key}),
+            "topics": (self.format_and_save_youtube_topics,
+                       {"region_code": region_code, "max_results": max_results,
+                        "api_key": api_key}),
+            "music": (self.format_and_save_youtube_music,
+                      {"region_code": region_code, "max_results": max_results,
+                       "api_key": api_key}),
+            "tiktok": (self.format_and_save_tiktok_trends,
+                       {"api_key": tiktok_api_key}),
+        }
+        # One timestamp for the whole batch keeps the four files' metadata consistent
+        retrieved_at = _now_iso()
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = {name: executor.submit(func, pretty_print=pretty_print,
+                                             compress=compress, retrieved_at=retrieved_at,
+                                             **kwargs)
+                       for name, (func, kwargs) in jobs.items()}
+            return {name: future.result() for name, future in futures.items()}
 
 
 # Convenience functions for quick usage
@@ -461,27 +669,12 @@ if __name__ == "__main__":
     formatter = TrendResultFormatter()
     
     try:
-        # Example: Save YouTube trending videos (US region, top 10)
-        print("Fetching and saving YouTube trending videos...")
-        video_file = formatter.format_and_save_youtube_videos(
-            region_code="US", 
-            max_results=10,
-            include_captions=False
-        )
-        print(f"Saved to: {video_file}")
-        
-        # Example: Save YouTube trending topics
-        print("\nFetching and saving YouTube trending topics...")
-        topics_file = formatter.format_and_save_youtube_topics(
-            region_code="US", 
-            max_results=15
-        )
-        print(f"Saved to: {topics_file}")
-        
-        # Example: Save TikTok trending data
-        print("\nFetching and saving TikTok trending data...")
-        tiktok_file = formatter.format_and_save_tiktok_trends()
-        print(f"Saved to: {tiktok_file}")
+        # Example: Fetch and save every trend type (US region) concurrently
+        print("Fetching and saving YouTube videos, topics, music and TikTok trends...")
+        saved = formatter.format_and_save_all(region_code="US", max_results=10,
+                                              pretty_print=True)
+        for kind, path in saved.items():
+            print(f"Saved {kind} to: {path}")
         
         print("\nAll data has been formatted and saved successfully!")
         
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import copy
+import importlib.util
 import logging
 import os
 import re
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Any, Optional, Tuple
 
+import httpx
 import requests
 
-# Ensure .env is loaded via the project config module
-import config  # noqa: F401 (side-effect: loads .env)
+import config
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the HTTP client's stdlib-based .json()
+    orjson = None
 
 """
 YouTube Captions Troubleshooting:
@@ -39,7 +50,8 @@ logger = logging.getLogger(__name__)
 # To enable debug logging for troubleshooting, uncomment the next line:
 # logger.setLevel(logging.DEBUG)
 
-# Environment variables
+# Environment variables (the .env file must be loaded before reading them)
+config.load_env()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 TIKTOK_RAPIDAPI_KEY = os.getenv("TIKTOK_RAPIDAPI_KEY")
 
@@ -51,6 +63,11 @@ VALID_REGION_CODES = {
 
 MUSIC_CATEGORY_ID = "10"
 MAX_YOUTUBE_RESULTS = 50
+# Partial response: only what _extract_video_data reads, plus the list etag
+YOUTUBE_VIDEOS_FIELDS = (
+    "etag,items(id,snippet(title,channelTitle,tags,categoryId,description,publishedAt),"
+    "statistics(viewCount,likeCount,commentCount))"
+)
 YOUTUBE_VIDEO_ID_PATTERN = r'^[a-zA-Z0-9_-]{11}$'
 
 # API endpoints
@@ -59,6 +76,112 @@ YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
 TIKTOK_HASHTAGS_URL = "https://api.apify.com/v2/acts/dtrungtin~tiktok-trending-hashtags/runs/last/dataset/items?clean=1"
 TIKTOK_SOUNDS_URL = "https://api.apify.com/v2/acts/dtrungtin~tiktok-trending-sounds/runs/last/dataset/items?clean=1"
 
+HTTP_TIMEOUT = 30
+# Parallel requests to the same host share one connection over HTTP/2 when h2 is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Trending lists change over minutes to hours, so identical requests within the TTL are
+# answered from memory (per process). Call clear_response_cache() to force a refetch.
+YOUTUBE_CACHE_TTL_SECONDS = 5 * 60
+TIKTOK_CACHE_TTL_SECONDS = 15 * 60
+RESPONSE_CACHE_MAXSIZE = 256
+_response_cache: Dict[Tuple[Any, ...], Tuple[float, Any]] = {}
+# After the TTL runs out, videos.list is asked again with the last ETag; a 304 reply has
+# no body, so the previous results are reused without downloading or parsing the list.
+_etag_cache: Dict[Tuple[Any, ...], Tuple[str, Any]] = {}
+
+# Concurrent misses for the same key share one upstream request: the first caller fetches,
+# the others wait on its Event and get copies of the result stored next to it.
+_inflight: Dict[Tuple[Any, ...], Tuple[threading.Event, List[Any]]] = {}
+_inflight_lock = threading.Lock()
+
+
+def _cache_get(key: Tuple[Any, ...]) -> Optional[Any]:
+    entry = _response_cache.get(key)
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    # Copies keep callers that mutate results from altering the cached data
+    return copy.deepcopy(entry[1])
+
+
+def _cache_put(key: Tuple[Any, ...], value: Any, ttl_seconds: float) -> None:
+    now = time.monotonic()
+    if len(_response_cache) >= RESPONSE_CACHE_MAXSIZE:
+        for stale in [k for k, (expires, _) in _response_cache.items() if expires <= now]:
+            del _response_cache[stale]
+        while len(_response_cache) >= RESPONSE_CACHE_MAXSIZE:
+            del _response_cache[next(iter(_response_cache))]
+    _response_cache[key] = (now + ttl_seconds, copy.deepcopy(value))
+
+
+def _etag_headers(key: Tuple[Any, ...]) -> Dict[str, str]:
+    entry = _etag_cache.get(key)
+    return {"If-None-Match": entry[0]} if entry else {}
+
+
+def _remember_etag(key: Tuple[Any, ...], etag: Optional[str], value: Any) -> None:
+    if not etag:
+        return
+    _etag_cache.pop(key, None)
+    while len(_etag_cache) >= RESPONSE_CACHE_MAXSIZE:
+        del _etag_cache[next(iter(_etag_cache))]
+    _etag_cache[key] = (etag, copy.deepcopy(value))
+
+
+def _reuse_not_modified(key: Tuple[Any, ...], ttl_seconds: float) -> Any:
+    """Results for a 304 reply: the data stored with the ETag, cached for another TTL."""
+    value = _etag_cache[key][1]
+    _cache_put(key, value, ttl_seconds)
+    return copy.deepcopy(value)
+
+
+def _singleflight(key: Tuple[Any, ...], fetch: Callable[[], Any]) -> Any:
+    """Return fetch() for key, running it at most once at a time across threads."""
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = (threading.Event(), [])
+    event, outcome = flight
+    if not leader:
+        event.wait()
+        value, error = outcome
+        if error is not None:
+            raise error
+        return copy.deepcopy(value)
+
+    try:
+        # A previous leader may have filled the cache since this caller's miss
+        value = _cache_get(key)
+        if value is None:
+            value = fetch()
+        outcome[:] = [copy.deepcopy(value), None]
+        return value
+    except BaseException as e:
+        outcome[:] = [None, e]
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        event.set()
+
+
+def clear_response_cache() -> None:
+    """Forget all cached YouTube/TikTok responses."""
+    _response_cache.clear()
+    _etag_cache.clear()
+
+
+def _json(response: Any) -> Any:
+    """Parse a requests/httpx response body, with orjson when it is installed.
+
+    orjson parses the raw bytes directly, skipping the decode-to-str step and the slower
+    stdlib parser; its errors are ValueErrors like those of .json().
+    """
+    if orjson is None:
+        return response.json()
+    return orjson.loads(response.content)
+
 
 class ValidationError(ValueError):
     """Custom exception for validation errors."""
@@ -216,7 +339,7 @@ def _get_captions_via_youtube_api(video_id: str, language: str, api_key: str) ->
     }
     
     try:
-        response = requests.get(YOUTUBE_CAPTIONS_URL, params=params, timeout=30)
+        response = config.http_session().get(YOUTUBE_CAPTIONS_URL, params=params, timeout=30)
         
         # Check for specific error codes
         if response.status_code == 403:
@@ -227,7 +350,7 @@ def _get_captions_via_youtube_api(video_id: str, language: str, api_key: str) ->
             return None
         
         response.raise_for_status()
-        data = response.json()
+        data = _json(response)
         
         caption_tracks = data.get("items", [])
         logger.info(f"Found {len(caption_tracks)} caption tracks for video {video_id}")
@@ -335,7 +458,7 @@ def _download_caption_content(caption_track: Dict[str, Any], api_key: str) -> Op
         download_params["tfmt"] = fmt
         
         try:
-            response = requests.get(
+            response = config.http_session().get(
                 f"{YOUTUBE_CAPTIONS_URL}/{caption_id}",
                 params=download_params,
                 headers={"Accept": "application/json"},
@@ -444,9 +567,68 @@ def fetch_youtube_trending_videos(
         logger.error(f"Validation error: {e}")
         return []
 
-    # Prepare API request
+    params = _youtube_videos_params(region_code, max_results, video_category_id, key)
+    cache_key = ("youtube_videos", region_code, params["maxResults"], video_category_id,
+                 caption_language if include_captions else None)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+    return _singleflight(cache_key, lambda: _download_youtube_videos(
+        cache_key, params, include_captions, caption_language, key))
+
+
+def _download_youtube_videos(
+    cache_key: Tuple[Any, ...],
+    params: Dict[str, Any],
+    include_captions: bool,
+    caption_language: str,
+    key: str,
+) -> List[Dict[str, Any]]:
+    """Request videos.list for fetch_youtube_trending_videos and cache the simplified results."""
+    try:
+        response = config.http_session().get(YOUTUBE_VIDEOS_URL, params=params,
+                                             headers=_etag_headers(cache_key), timeout=30)
+        response.raise_for_status()
+        if response.status_code == 304 and cache_key in _etag_cache:
+            return _reuse_not_modified(cache_key, YOUTUBE_CACHE_TTL_SECONDS)
+        data = _json(response)
+        items = data.get("items", [])
+        
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to fetch trending videos: {e}")
+        return []
+    except ValueError as e:
+        logger.error(f"Invalid response format: {e}")
+        return []
+
+    # Process video data
+    results = [_extract_video_data(item) for item in items]
+    
+    # Add captions if requested
+    if include_captions:
+        for video_data in results:
+            logger.info(f"Fetching captions for video {video_data['id']}")
+            video_data["captions"] = get_video_captions(
+                video_data["id"], 
+                language=caption_language, 
+                api_key=key
+            )
+    
+    _cache_put(cache_key, results, YOUTUBE_CACHE_TTL_SECONDS)
+    _remember_etag(cache_key, response.headers.get("ETag") or data.get("etag"), results)
+    return results
+
+
+def _youtube_videos_params(
+    region_code: str, max_results: int, video_category_id: Optional[str], key: str
+) -> Dict[str, Any]:
+    """Build the query parameters for a videos.list mostPopular request."""
+    if max_results > MAX_YOUTUBE_RESULTS:
+        logger.warning(f"max_results={max_results} exceeds the API limit; "
+                       f"only {MAX_YOUTUBE_RESULTS} videos will be returned")
     params = {
-        "part": "snippet,contentDetails,statistics",
+        "part": "snippet,statistics",
+        "fields": YOUTUBE_VIDEOS_FIELDS,
         "chart": "mostPopular",
         "regionCode": region_code,
         "maxResults": max(1, min(max_results, MAX_YOUTUBE_RESULTS)),
@@ -455,38 +637,92 @@ def fetch_youtube_trending_videos(
     
     if video_category_id:
         params["videoCategoryId"] = video_category_id
+    return params
+
+
+async def _fetch_youtube_videos_async(
+    client: httpx.AsyncClient,
+    region_code: str,
+    video_category_id: Optional[str],
+    max_results: int,
+    key: str,
+) -> List[Dict[str, Any]]:
+    """Fetch one region/category trending list on a shared AsyncClient (no captions)."""
+    try:
+        region_code = validate_region_code(region_code)
+    except ValidationError as e:
+        logger.error(f"Validation error: {e}")
+        return []
+
+    params = _youtube_videos_params(region_code, max_results, video_category_id, key)
+    cache_key = ("youtube_videos", region_code, params["maxResults"], video_category_id, None)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        response = requests.get(YOUTUBE_VIDEOS_URL, params=params, timeout=30)
+        response = await client.get(YOUTUBE_VIDEOS_URL, params=params,
+                                    headers=_etag_headers(cache_key))
         response.raise_for_status()
-        data = response.json()
+        if response.status_code == 304 and cache_key in _etag_cache:
+            return _reuse_not_modified(cache_key, YOUTUBE_CACHE_TTL_SECONDS)
+        data = _json(response)
         items = data.get("items", [])
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch trending videos: {e}")
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to fetch trending videos for {region_code}: {e}")
         return []
     except ValueError as e:
         logger.error(f"Invalid response format: {e}")
         return []
 
-    # Process video data
-    results = []
-    for item in items:
-        video_data = _extract_video_data(item)
+    results = [_extract_video_data(item) for item in items]
+    _cache_put(cache_key, results, YOUTUBE_CACHE_TTL_SECONDS)
+    _remember_etag(cache_key, response.headers.get("ETag") or data.get("etag"), results)
+    return results
+
+
+async def fetch_youtube_trending_many(
+    regions: Iterable[str],
+    categories: Iterable[Optional[str]] = (None,),
+    max_results: int = 25,
+    api_key: Optional[str] = None,
+) -> Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]]:
+    """Fetch trending videos for every region/category combination concurrently.
+    
+    All requests go out together on one AsyncClient, so the total time is close to
+    that of the slowest request rather than the sum. Captions are not fetched.
+    
+    Args:
+        regions: Country codes to fetch
+        categories: Category IDs to fetch per region (None for all categories,
+            MUSIC_CATEGORY_ID for music)
+        max_results: Maximum number of videos per request (max 50)
+        api_key: YouTube API key (optional)
         
-        # Add captions if requested
-        if include_captions:
-            logger.info(f"Fetching captions for video {video_data['id']}")
-            captions = get_video_captions(
-                video_data["id"], 
-                language=caption_language, 
-                api_key=key
-            )
-            video_data["captions"] = captions
+    Returns:
+        Dict mapping (region_code, category_id) to the list of video dicts
         
-        results.append(video_data)
-    
-    return results
+    Raises:
+        RuntimeError: If API key is not available
+    """
+    key = api_key or YOUTUBE_API_KEY
+    if not key:
+        raise RuntimeError(
+            "YOUTUBE_API_KEY is not set. Add it to your .env or pass api_key explicitly."
+        )
+    try:
+        key = validate_api_key(key, "YouTube")
+    except ValidationError as e:
+        logger.error(f"Validation error: {e}")
+        return {}
+
+    combos = [(region, category) for region in regions for category in categories]
+    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, http2=HTTP2_AVAILABLE) as client:
+        results = await asyncio.gather(*(
+            _fetch_youtube_videos_async(client, region, category, max_results, key)
+            for region, category in combos
+        ))
+    return dict(zip(combos, results))
 
 
 def _extract_video_data(item: Dict[str, Any]) -> Dict[str, Any]:
@@ -569,7 +805,10 @@ def get_tiktok_trending(api_key: Optional[str] = None) -> Dict[str, List[Dict[st
     """Fetch trending TikTok hashtags and sounds using Apify APIs.
 
     Optionally provide an Apify API token via `api_key` or set APIFY_API_TOKEN in the environment
-    for higher rate limits.
+    for higher rate limits. Blocking wrapper around get_tiktok_trending_async; it also
+    works when called from a thread that is already running an event loop (Jupyter, async
+    apps), though awaiting get_tiktok_trending_async there avoids blocking the loop.
+    Threads that call this at the same time share a single fetch.
 
     Args:
         api_key: Apify API token (optional)
@@ -579,25 +818,62 @@ def get_tiktok_trending(api_key: Optional[str] = None) -> Dict[str, List[Dict[st
             - hashtags: [{ 'hashtag': str, 'count': int }]
             - sounds: [{ 'sound_name': str, 'play_count': int }]
     """
+    return _singleflight(("tiktok",), lambda: _run_blocking(lambda: get_tiktok_trending_async(api_key=api_key)))
+
+
+def _run_blocking(make_coro: Callable[[], Any]) -> Any:
+    """Run the coroutine from make_coro() to completion and return its result.
+
+    asyncio.run refuses to start inside a running event loop, so in that case the
+    coroutine gets its own loop on a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(make_coro())
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(lambda: asyncio.run(make_coro())).result()
+
+
+async def get_tiktok_trending_async(api_key: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Fetch trending TikTok hashtags and sounds concurrently.
+
+    Args:
+        api_key: Apify API token (optional)
+        
+    Returns:
+        Same structure as get_tiktok_trending
+    """
+    cached = _cache_get(("tiktok",))
+    if cached is not None:
+        return cached
+
     apify_token = api_key or os.getenv("APIFY_API_TOKEN")
     headers = {"Authorization": f"Bearer {apify_token}"} if apify_token else {}
 
     try:
-        # Fetch both hashtags and sounds concurrently
-        hashtags_response = requests.get(TIKTOK_HASHTAGS_URL, headers=headers, timeout=30)
-        sounds_response = requests.get(TIKTOK_SOUNDS_URL, headers=headers, timeout=30)
+        # Both datasets come from the same host; the requests overlap instead of queueing
+        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers=headers,
+                                     http2=HTTP2_AVAILABLE) as client:
+            hashtags_response, sounds_response = await asyncio.gather(
+                client.get(TIKTOK_HASHTAGS_URL),
+                client.get(TIKTOK_SOUNDS_URL),
+            )
         
         hashtags = _process_tiktok_hashtags(hashtags_response)
         sounds = _process_tiktok_sounds(sounds_response)
         
-        return {"hashtags": hashtags, "sounds": sounds}
+        result = {"hashtags": hashtags, "sounds": sounds}
+        if hashtags_response.is_success and sounds_response.is_success:
+            _cache_put(("tiktok",), result, TIKTOK_CACHE_TTL_SECONDS)
+        return result
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Failed to fetch TikTok trending data: {e}")
         return {"hashtags": [], "sounds": []}
 
 
-def _process_tiktok_hashtags(response: requests.Response) -> List[Dict[str, Any]]:
+def _process_tiktok_hashtags(response: httpx.Response) -> List[Dict[str, Any]]:
     """Process TikTok hashtags API response.
     
     Args:
@@ -606,22 +882,10 @@ def _process_tiktok_hashtags(response: requests.Response) -> List[Dict[str, Any]
     Returns:
         List of processed hashtag data
     """
-    hashtags = []
-    
-    if response.ok:
-        try:
-            for item in response.json():
-                hashtags.append({
-                    "hashtag": item.get("hashtag", ""),
-                    "count": int(item.get("playCount", 0) or 0),
-                })
-        except Exception as e:
-            logger.error(f"Error processing hashtags response: {e}")
-    
-    return hashtags
+    return _parse_tiktok_items(response, "hashtag", "hashtag", "count", "hashtags")
 
 
-def _process_tiktok_sounds(response: requests.Response) -> List[Dict[str, Any]]:
+def _process_tiktok_sounds(response: httpx.Response) -> List[Dict[str, Any]]:
     """Process TikTok sounds API response.
     
     Args:
@@ -630,19 +894,22 @@ def _process_tiktok_sounds(response: requests.Response) -> List[Dict[str, Any]]:
     Returns:
         List of processed sound data
     """
-    sounds = []
-    
-    if response.ok:
-        try:
-            for item in response.json():
-                sounds.append({
-                    "sound_name": item.get("soundName", ""),
-                    "play_count": int(item.get("playCount", 0) or 0),
-                })
-        except Exception as e:
-            logger.error(f"Error processing sounds response: {e}")
-    
-    return sounds
+    return _parse_tiktok_items(response, "soundName", "sound_name", "play_count", "sounds")
+
+
+def _parse_tiktok_items(response: httpx.Response, name_key: str, out_name: str,
+                        out_count: str, label: str) -> List[Dict[str, Any]]:
+    """Map Apify dataset items to {out_name: item[name_key], out_count: playCount}."""
+    if not response.is_success:
+        return []
+    try:
+        return [
+            {out_name: item.get(name_key, ""), out_count: int(item.get("playCount", 0) or 0)}
+            for item in _json(response)
+        ]
+    except Exception as e:
+        logger.error(f"Error processing {label} response: {e}")
+        return []
 
 
 def test_youtube_captions_api(api_key: Optional[str] = None) -> Dict[str, Any]:
@@ -675,11 +942,11 @@ def test_youtube_captions_api(api_key: Optional[str] = None) -> Dict[str, Any]:
     }
     
     try:
-        response = requests.get(YOUTUBE_CAPTIONS_URL, params=params, timeout=30)
+        response = config.http_session().get(YOUTUBE_CAPTIONS_URL, params=params, timeout=30)
         logger.info(f"API response status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = _json(response)
             caption_tracks = data.get("items", [])
             logger.info(f"Found {len(caption_tracks)} caption tracks")
             
@@ -1,7 +1,15 @@
 import os
+import random
+import subprocess
+import tempfile
 import time
-import requests
-from typing import Optional, Tuple
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+import config
 
 # ---- Azure OpenAI (Sora) config ----
 AZURE_OPENAI_ENDPOINT = os.environ.get("AZURE_OPENAI_ENDPOINT")
@@ -13,10 +21,16 @@ if not AZURE_OPENAI_ENDPOINT:
 if not AZURE_OPENAI_API_KEY:
     raise RuntimeError("AZURE_OPENAI_API_KEY must be set in environment")
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
 HEADERS = {
     "api-key": AZURE_OPENAI_API_KEY,
     "Content-Type": "application/json"
 }
+# Passed as params= so requests does the query-string encoding
+API_PARAMS = {"api-version": AZURE_OPENAI_API_VERSION}
+# Sora jobs get_stock_videos runs at once by default; the deployment is rate limited
+SORA_MAX_CONCURRENT_JOBS = 4
 
 def _aspect_ratio_to_dims(aspect_ratio: Optional[str], fallback: Tuple[int, int]) -> Tuple[int, int]:
     if not aspect_ratio:
@@ -43,6 +57,8 @@ def generate_video_with_sora(
     width: Optional[int] = None,
     height: Optional[int] = None,
     poll_interval_seconds: int = 5,
+    max_poll_delay: float = 45,
+    total_poll_timeout: float = 600,
     request_timeout_seconds: int = 600,
     n_variants: int = 1,
     model: str = "sora",
@@ -54,7 +70,7 @@ def generate_video_with_sora(
     n_seconds = max(1, min(int(duration_seconds), 20))
 
     # 1) Create generation job
-    create_url = f"{AZURE_OPENAI_ENDPOINT}/openai/v1/video/generations/jobs?api-version={AZURE_OPENAI_API_VERSION}"
+    create_url = f"{AZURE_OPENAI_ENDPOINT}/openai/v1/video/generations/jobs"
     payload = {
         "model": model,
         "prompt": prompt,
@@ -63,17 +79,28 @@ def generate_video_with_sora(
         "n_seconds": n_seconds,
         "n_variants": int(n_variants),
     }
-    resp = requests.post(create_url, json=payload, headers=HEADERS, timeout=request_timeout_seconds)
+    resp = config.http_session().post(create_url, params=API_PARAMS, json=payload, headers=HEADERS,
+                                      timeout=request_timeout_seconds)
     resp.raise_for_status()
-    job_id = resp.json().get("id")
+    job = resp.json()
+    job_id = job.get("id")
     if not job_id:
-        raise RuntimeError(f"Unexpected Sora create response: {resp.json()}")
+        raise RuntimeError(f"Unexpected Sora create response: {job}")
 
     # 2) Poll for completion
-    status_url = f"{AZURE_OPENAI_ENDPOINT}/openai/v1/video/generations/jobs/{job_id}?api-version={AZURE_OPENAI_API_VERSION}"
+    status_url = f"{AZURE_OPENAI_ENDPOINT}/openai/v1/video/generations/jobs/{quote(job_id, safe='')}"
+    # Back off 1.5x per poll up to max_poll_delay; the jitter keeps concurrent jobs
+    # from polling in lockstep
+    delay = poll_interval_seconds
+    deadline = time.monotonic() + total_poll_timeout
     while True:
-        time.sleep(poll_interval_seconds)
-        status_resp = requests.get(status_url, headers=HEADERS, timeout=request_timeout_seconds)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Sora job {job_id} did not finish within {total_poll_timeout}s")
+        time.sleep(min(delay + random.uniform(0, delay * 0.1), remaining))
+        delay = min(max_poll_delay, delay * 1.5)
+        status_resp = config.http_session().get(status_url, params=API_PARAMS, headers=HEADERS,
+                                                timeout=request_timeout_seconds)
         status_resp.raise_for_status()
         job_status = status_resp.json()
         status = job_status.get("status", "").lower()
@@ -88,16 +115,222 @@ def generate_video_with_sora(
 
     # 3) Download first variant’s video
     generation_id = generations[0].get("id")
-    content_url = f"{AZURE_OPENAI_ENDPOINT}/openai/v1/video/generations/{generation_id}/content/video?api-version={AZURE_OPENAI_API_VERSION}"
-    video_resp = requests.get(content_url, headers=HEADERS, timeout=request_timeout_seconds)
-    video_resp.raise_for_status()
-    with open(out_path, "wb") as f:
-        f.write(video_resp.content)
+    if not generation_id:
+        raise RuntimeError(f"Generation without an id: {generations[0]}")
+    content_url = (f"{AZURE_OPENAI_ENDPOINT}/openai/v1/video/generations/"
+                   f"{quote(generation_id, safe='')}/content/video")
+    # Stream to disk in 1 MiB chunks rather than holding the whole MP4 in memory
+    with config.http_session().get(content_url, params=API_PARAMS, headers=HEADERS,
+                                   timeout=request_timeout_seconds, stream=True) as video_resp:
+        video_resp.raise_for_status()
+        with open(out_path, "wb") as f:
+            for chunk in video_resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
     return out_path
 
 def get_stock_video(query, out_path="stock.mp4"):
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("get_stock_video needs a non-empty query")
     return generate_video_with_sora(
         prompt=query,
         out_path=out_path,
         duration_seconds=6,
     )
+
+
+def get_stock_videos(
+    queries: List[str],
+    workers: Optional[int] = None,
+    out_dir: Optional[str] = None,
+) -> List[str]:
+    """Generate one stock clip per query with get_stock_video concurrently.
+
+    A Sora job spends most of its time queued or rendering on the service, so the jobs
+    are created and polled side by side rather than one after another. At most
+    SORA_MAX_CONCURRENT_JOBS jobs run at a time unless `workers` overrides it.
+
+    Returns the clip paths, in the same order as `queries`, inside `out_dir` (a new
+    temporary directory when not given).
+    """
+    if not queries:
+        return []
+    out_dir = out_dir or tempfile.mkdtemp(prefix="stock_")
+    out_paths = [os.path.join(out_dir, uuid.uuid4().hex + ".mp4") for _ in queries]
+    workers = workers or min(len(queries), SORA_MAX_CONCURRENT_JOBS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(get_stock_video, query, out_path)
+            for query, out_path in zip(queries, out_paths)
+        ]
+        return [future.result() for future in futures]
+
+
+# ---- Vertical (9:16) formatting ----
+VERTICAL_WIDTH, VERTICAL_HEIGHT = 1080, 1920
+SHORTS_MAX_SECONDS = 59
+
+# Encoder-specific output options; override the choice with VIDEO_ENCODER
+_ENCODER_OPTIONS = {
+    "h264_nvenc": {"preset": "p5", "rc": "vbr", "cq": 23},
+    "h264_qsv": {"preset": "veryfast", "global_quality": 23},
+    "h264_vaapi": {"qp": 23},
+    "libx264": {"preset": "veryfast", "crf": 23},
+}
+VAAPI_DEVICE = os.environ.get("VAAPI_DEVICE", "/dev/dri/renderD128")
+
+
+@lru_cache(maxsize=1)
+def _available_encoders() -> frozenset:
+    """Names of the encoders the local ffmpeg build supports (probed once)."""
+    try:
+        out = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return frozenset()
+    # Lines look like " V....D h264_nvenc   NVIDIA NVENC H.264 encoder"
+    return frozenset(parts[1] for parts in map(str.split, out.splitlines()) if len(parts) > 1)
+
+
+def format_vertical(input_path: str, out_path: str = "vertical.mp4") -> str:
+    """Scale and pad a clip to 1080x1920, trimmed to Shorts length, and save it to out_path.
+
+    With h264_nvenc the decode and scale run on the GPU (cuvid + scale_npp); frames are
+    only brought back to system memory for the letterbox padding before NVENC encodes.
+    Set VIDEO_ENCODER to h264_nvenc, h264_qsv, h264_vaapi or libx264 to force a choice;
+    otherwise NVENC is used when ffmpeg has it, falling back to libx264 if it fails
+    (e.g. the build has NVENC but the machine has no NVIDIA GPU).
+    """
+    return _render_vertical(input_path, out_path)
+
+
+def render_final(video_path: str, music_path: str, out_path: str = "final.mp4") -> str:
+    """Format a clip to vertical and put a music track under it in a single ffmpeg pass.
+
+    Equivalent to format_vertical followed by a separate music overlay, but the video is
+    decoded and encoded once and no intermediate file is written. The music replaces the
+    clip's own audio and the output ends with the shorter of the two.
+    """
+    return _render_vertical(video_path, out_path, music_path)
+
+
+def transcode_batch(
+    pairs: List[Tuple[str, Optional[str]]],
+    workers: Optional[int] = None,
+    out_dir: Optional[str] = None,
+) -> List[str]:
+    """Render several (video_path, music_path) pairs with render_final concurrently.
+
+    music_path may be None to only format the clip. Each ffmpeg process runs on its own
+    thread, so NVENC can work on several sessions at once instead of one clip at a time.
+    The worker count comes from `workers`, then VIDEO_BATCH_PARALLELISM, then defaults
+    to 3 per GPU for NVENC or a quarter of the CPUs (4 threads each) for software
+    encoders. NVENC renders are spread round-robin over all GPUs so each card's
+    decoder and encoder engines are kept busy, not just GPU 0's.
+
+    Returns the output paths, in the same order as `pairs`, inside `out_dir` (a new
+    temporary directory when not given).
+    """
+    if not pairs:
+        return []
+    gpu_count = _gpu_count() if _default_encoder() == "h264_nvenc" else 0
+    if workers is None:
+        env_workers = os.environ.get("VIDEO_BATCH_PARALLELISM")
+        if env_workers:
+            workers = int(env_workers)
+        else:
+            workers = 3 * gpu_count if gpu_count else max(1, (os.cpu_count() or 4) // 4)
+    # Software encoders would otherwise each start one thread per core
+    threads = None if gpu_count else 4
+
+    out_dir = out_dir or tempfile.mkdtemp(prefix="vertical_")
+    out_paths = [os.path.join(out_dir, uuid.uuid4().hex + ".mp4") for _ in pairs]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_render_vertical, video_path, out_path, music_path, threads,
+                            i % gpu_count if gpu_count else None)
+            for i, ((video_path, music_path), out_path) in enumerate(zip(pairs, out_paths))
+        ]
+        return [future.result() for future in futures]
+
+
+@lru_cache(maxsize=1)
+def _gpu_count() -> int:
+    """Number of NVIDIA GPUs to spread NVENC work over (VIDEO_GPU_COUNT or nvidia-smi)."""
+    env_count = os.environ.get("VIDEO_GPU_COUNT")
+    if env_count:
+        return max(1, int(env_count))
+    try:
+        out = subprocess.run(["nvidia-smi", "-L"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return 1
+    return max(1, sum(1 for line in out.splitlines() if line.startswith("GPU ")))
+
+
+def _default_encoder() -> str:
+    encoder = os.environ.get("VIDEO_ENCODER")
+    if encoder:
+        return encoder
+    return "h264_nvenc" if "h264_nvenc" in _available_encoders() else "libx264"
+
+
+def _render_vertical(input_path: str, out_path: str, music_path: Optional[str] = None,
+                     threads: Optional[int] = None, gpu: Optional[int] = None) -> str:
+    import ffmpeg
+
+    encoder = _default_encoder()
+    if encoder == "h264_nvenc" and not os.environ.get("VIDEO_ENCODER"):
+        try:
+            _run_vertical(input_path, out_path, encoder, music_path, threads, gpu)
+        except ffmpeg.Error:
+            _run_vertical(input_path, out_path, "libx264", music_path, threads)
+    else:
+        _run_vertical(input_path, out_path, encoder, music_path, threads, gpu)
+    return out_path
+
+
+def _run_vertical(input_path: str, out_path: str, encoder: str,
+                  music_path: Optional[str] = None, threads: Optional[int] = None,
+                  gpu: Optional[int] = None) -> None:
+    import ffmpeg
+
+    output_options = dict(_ENCODER_OPTIONS.get(encoder, {}))
+    if encoder == "h264_nvenc":
+        input_kwargs = {"hwaccel": "cuda", "hwaccel_output_format": "cuda"}
+        if gpu is not None:
+            # Decode, scale and encode all on the same card
+            input_kwargs["hwaccel_device"] = str(gpu)
+            output_options["gpu"] = gpu
+        video = (
+            ffmpeg.input(input_path, **input_kwargs)
+            .video.filter("scale_npp", VERTICAL_WIDTH, VERTICAL_HEIGHT,
+                          force_original_aspect_ratio="decrease", format="nv12")
+            .filter("hwdownload")
+            .filter("format", "nv12")
+        )
+    else:
+        input_kwargs = {"vaapi_device": VAAPI_DEVICE} if encoder == "h264_vaapi" else {}
+        video = ffmpeg.input(input_path, **input_kwargs).video.filter(
+            "scale", VERTICAL_WIDTH, VERTICAL_HEIGHT, force_original_aspect_ratio="decrease"
+        )
+    video = video.filter("pad", VERTICAL_WIDTH, VERTICAL_HEIGHT, "(ow-iw)/2", "(oh-ih)/2")
+    if encoder == "h264_vaapi":
+        video = video.filter("format", "nv12").filter("hwupload")
+
+    if music_path:
+        streams = [video, ffmpeg.input(music_path).audio]
+        output_options.update(acodec="aac", shortest=None)
+    else:
+        # Keep the clip's audio when it has any; copying needs no re-encode
+        streams = [video]
+        output_options.update(map="0:a?", acodec="copy")
+
+    if threads:
+        output_options["threads"] = threads
+
+    (
+        ffmpeg.output(*streams, out_path, vcodec=encoder, t=SHORTS_MAX_SECONDS,
+                      movflags="+faststart", **output_options)
+        .run(overwrite_output=True, quiet=True)
+    )
@@ -25,9 +25,28 @@ def get_my_channel(
     return items[0] if items else None
 
 
+# The statistics/snippet/uploads helpers share one channels.list call per client.
+# Entries hold the client itself so its id() cannot be reused while cached.
+_CHANNEL_PARTS = ("snippet", "statistics", "contentDetails", "brandingSettings")
+_channel_cache: Dict[int, tuple[Resource, Optional[Dict[str, Any]]]] = {}
+
+
+def _cached_my_channel(youtube: Resource) -> Optional[Dict[str, Any]]:
+    """Return the authenticated user's channel with all helper parts, fetched once per client."""
+    key = id(youtube)
+    if key not in _channel_cache:
+        _channel_cache[key] = (youtube, get_my_channel(youtube, parts=_CHANNEL_PARTS))
+    return _channel_cache[key][1]
+
+
+def invalidate_my_channel_cache() -> None:
+    """Drop cached channel data, e.g. after updating the channel or in tests."""
+    _channel_cache.clear()
+
+
 def get_my_channel_statistics(youtube: Resource) -> Dict[str, Any]:
     """Return key statistics for the authenticated user's channel."""
-    channel = get_my_channel(youtube, parts=("statistics",))
+    channel = _cached_my_channel(youtube)
     stats = (channel or {}).get("statistics", {})
     return {
         "viewCount": int(stats.get("viewCount", 0) or 0),
@@ -39,13 +58,13 @@ def get_my_channel_statistics(youtube: Resource) -> Dict[str, Any]:
 
 def get_my_channel_snippet(youtube: Resource) -> Dict[str, Any]:
     """Return the snippet (title, description, thumbnails) for the user's channel."""
-    channel = get_my_channel(youtube, parts=("snippet",))
+    channel = _cached_my_channel(youtube)
     return (channel or {}).get("snippet", {})
 
 
 def get_my_uploads_playlist_id(youtube: Resource) -> Optional[str]:
     """Return the uploads playlist ID for the authenticated user's channel."""
-    channel = get_my_channel(youtube, parts=("contentDetails",))
+    channel = _cached_my_channel(youtube)
     if not channel:
         return None
     playlists = channel.get("contentDetails", {}).get("relatedPlaylists", {})
@@ -55,25 +74,28 @@ def get_my_uploads_playlist_id(youtube: Resource) -> Optional[str]:
 def get_my_recent_uploads(
     youtube: Resource, max_results: int = 25
 ) -> List[Dict[str, Any]]:
-    """Return recent uploaded videos (as playlistItems) from the channel's uploads playlist."""
+    """Return recent uploaded videos (as playlistItems) from the channel's uploads playlist.
+
+    Each page token only arrives with the previous page, so pages are fetched in order;
+    every page asks for just the items still missing, capped at the API's 50.
+    """
     uploads_playlist_id = get_my_uploads_playlist_id(youtube)
     if not uploads_playlist_id:
         return []
 
     results: List[Dict[str, Any]] = []
-    request = youtube.playlistItems().list(
-        part="snippet,contentDetails",
-        playlistId=uploads_playlist_id,
-        maxResults=max(1, min(max_results, 50)),
-    )
-
-    while request is not None and len(results) < max_results:
-        response = request.execute()
-        items = response.get("items", [])
-        results.extend(items)
-        if len(results) >= max_results:
+    page_token: Optional[str] = None
+    while len(results) < max_results:
+        response = youtube.playlistItems().list(
+            part="snippet,contentDetails",
+            playlistId=uploads_playlist_id,
+            maxResults=max(1, min(max_results - len(results), 50)),
+            pageToken=page_token,
+        ).execute()
+        results.extend(response.get("items", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
             break
-        request = youtube.playlistItems().list_next(previous_request=request, previous_response=response)
 
     return results[:max_results]
 
@@ -81,19 +103,35 @@ def get_my_recent_uploads(
 def get_video_statistics(youtube: Resource, video_ids: List[str]) -> List[Dict[str, Any]]:
     """Return statistics for the given list of video IDs.
 
-    The API allows up to 50 IDs per call; this function batches if needed.
+    The API allows up to 50 IDs per call; larger lists are split into 50-ID calls that
+    are sent together as one batch HTTP request.
     """
+    calls = [
+        youtube.videos().list(part="id,statistics,snippet,contentDetails", id=",".join(video_ids[i : i + 50]))
+        for i in range(0, len(video_ids), 50)
+    ]
+    if len(calls) <= 1:
+        return calls[0].execute().get("items", []) if calls else []
+
+    responses: Dict[str, Dict[str, Any]] = {}
+    errors: List[Exception] = []
+
+    def _collect(request_id: str, response: Dict[str, Any], exception: Optional[Exception]) -> None:
+        if exception is not None:
+            errors.append(exception)
+        else:
+            responses[request_id] = response
+
+    batch = youtube.new_batch_http_request(callback=_collect)
+    for i, request in enumerate(calls):
+        batch.add(request, request_id=str(i))
+    batch.execute()
+    if errors:
+        raise errors[0]
+
     output: List[Dict[str, Any]] = []
-    for i in range(0, len(video_ids), 50):
-        chunk = video_ids[i : i + 50]
-        if not chunk:
-            continue
-        response = (
-            youtube.videos()
-            .list(part="id,statistics,snippet,contentDetails", id=",".join(chunk))
-            .execute()
-        )
-        output.extend(response.get("items", []))
+    for i in range(len(calls)):
+        output.extend(responses[str(i)].get("items", []))
     return output
 
 
@@ -1,35 +1,105 @@
+import logging
+import os
+import random
+import time
+from typing import Any, Dict
+
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 import google_auth_oauthlib.flow
-from config import CLIENT_SECRET_FILE
+from config import client_secret_file, youtube_token_file
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
+
+# Request pieces that are the same for every upload
+_UPLOAD_PART = "snippet,status"
+_DEFAULT_STATUS = {"privacyStatus": "public"}
+_UPLOAD_MIMETYPE = "video/mp4"
+
+# Uploads go up in 8 MiB pieces so a failure only resends the current chunk
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_RETRIES = 5
+RETRIABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Built API clients per OAuth client ID, so repeated calls in a process share one
+_youtube_clients: Dict[str, Any] = {}
+
 
 def youtube_authenticate():
-    flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
-        CLIENT_SECRET_FILE,
-        scopes=["https://www.googleapis.com/auth/youtube.upload"]
-    )
-    credentials = flow.run_console()
-    return build("youtube", "v3", credentials=credentials)
+    credentials = _load_credentials()
+    client = _youtube_clients.get(credentials.client_id)
+    if client is None:
+        client = build("youtube", "v3", credentials=credentials)
+        _youtube_clients[credentials.client_id] = client
+    return client
+
+
+def _load_credentials() -> Credentials:
+    """Return OAuth credentials, reusing and refreshing the saved token when possible.
+
+    The browser consent flow only runs when there is no usable token; its result is saved
+    to youtube_token_file() for the next run.
+    """
+    token_path = youtube_token_file()
+    credentials = None
+    if os.path.exists(token_path):
+        credentials = Credentials.from_authorized_user_file(token_path, SCOPES)
+        if credentials.valid:
+            return credentials
+        if credentials.expired and credentials.refresh_token:
+            try:
+                credentials.refresh(Request())
+            except RefreshError:
+                credentials = None
+        else:
+            credentials = None
+
+    if credentials is None:
+        flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
+            client_secret_file(),
+            scopes=SCOPES
+        )
+        credentials = flow.run_local_server(port=0)
+
+    with open(token_path, "w") as f:
+        f.write(credentials.to_json())
+    return credentials
 
 def upload_video(youtube, file_path, title, description, tags):
     request_body = {
-        "snippet": {
-            "title": title,
-            "description": description,
-            "tags": tags
-        },
-        "status": {
-            "privacyStatus": "public"
-        }
+        "snippet": {"title": title, "description": description, "tags": tags},
+        "status": _DEFAULT_STATUS,
     }
 
-    media_file = MediaFileUpload(file_path, chunksize=-1, resumable=True)
+    media_file = MediaFileUpload(file_path, chunksize=UPLOAD_CHUNK_SIZE, resumable=True,
+                                 mimetype=_UPLOAD_MIMETYPE)
 
     request = youtube.videos().insert(
-        part="snippet,status",
+        part=_UPLOAD_PART,
         body=request_body,
         media_body=media_file
     )
-    response = request.execute()
-    print(f"Upload successful: https://youtu.be/{response['id']}")
+    response = None
+    retries = 0
+    while response is None:
+        try:
+            status, response = request.next_chunk()
+        except HttpError as e:
+            if e.resp.status not in RETRIABLE_STATUS_CODES or retries >= UPLOAD_MAX_RETRIES:
+                raise
+            retries += 1
+            # Exponential backoff with jitter, then resume from the last acknowledged byte
+            delay = min(60, 2 ** retries)
+            time.sleep(delay + random.uniform(0, delay * 0.1))
+            continue
+        retries = 0
+        if status is not None:
+            logger.info("Uploaded %d%%", int(status.progress() * 100))
+    logger.info("Upload successful: https://youtu.be/%s", response["id"])
     return response